@@ -5,26 +5,47 @@ Supports both single-value and multi-value mappings with configurable validation
 """
 
 import re
-import yaml
 import os
 import sys
 import time
+import unicodedata
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Type
-from sqlalchemy import func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import load_only
 from ..lib.model_factory import ModelFactory
 from ..services.database import DatabaseManager
 from ..services.ai_matcher import AIMatcherService
 from ..services.logger import setup_logging
 from ..services.monitoring import MonitoringService
 from ..services.error_handler import ErrorHandler
+from ..utils.config_loader import load_yaml_config
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+def _lookup_key(value: str) -> str:
+    """In-memory name key matching the columns' utf8mb4_general_ci equality.
+
+    The collation ignores case and accents ('Épaule' = 'epaule'), so the key
+    folds both; ASCII values skip the Unicode decomposition.
+    """
+    key = value.strip().casefold()
+    if key.isascii():
+        return key
+    return ''.join(
+        char for char in unicodedata.normalize('NFKD', key)
+        if not unicodedata.combining(char)
+    )
 
 class GenericETL:
     def __init__(self, etl_type: str, config_path: str):
         self.config = None
         self.models = None
-        self.logger = setup_logging()
+        self.logger = setup_logging(use_queue=True)
         self.logger.info(f"Initializing {etl_type} ETL processor")
         
         self.monitoring = MonitoringService(self.logger)
@@ -38,33 +59,99 @@ class GenericETL:
         self.db_manager.ai_matcher = self.ai_matcher
 
     def _init_config(self, config_path: str, etl_type: str):
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_yaml_config(config_path)
         if etl_type not in self.config['etl_types']:
             raise ValueError(f"Unknown ETL type: {etl_type}")
         self.etl_type = etl_type
         self.etl_config = self.config['etl_types'][etl_type]
         self.settings = self.config['settings']
+
+        # Compile config-driven patterns once rather than on every value
+        self._split_re = None
+        if self.etl_config.get('multiple_values', False):
+            # Surrounding whitespace is consumed by the split itself
+            separator = self.etl_config.get('value_separator', '[/,]')
+            self._split_re = re.compile(rf'\s*(?:{separator})\s*')
+        skip_pattern = self.etl_config.get('validation', {}).get('skip_if_matches')
+        self._skip_re = self._compile_skip_pattern(skip_pattern) if skip_pattern else None
+
+        # Resolve per-record settings once instead of on every record
+        self._value_field = self.etl_config['value_field']
+        self._multiple_values = self.etl_config.get('multiple_values', False)
+        self._mapping_id_field = self.etl_config.get('mapping_id_field')
+
+        # Context fields and weights are fixed for the run
+        self._context_fields = tuple(
+            (context_field['field'], context_field.get('weight', 1.0))
+            for context_field in self.etl_config.get('context_fields', [])
+        )
+
+    @staticmethod
+    def _compile_skip_pattern(pattern: str):
+        """Compile a validation pattern, preferring the linear-time RE2 engine when installed."""
+        if re2 is not None:
+            try:
+                return re2.compile(pattern)
+            except Exception:
+                pass
+        return re.compile(pattern)
         
     def _init_models(self, config_path: str):
         self.models = ModelFactory.load_models(config_path)
         self.source_model = self.models[self.etl_config['source_table']]
         self.target_model = self.models[self.etl_config['table_name']]
+
+        self.dict_model = self.models.get(self.etl_config.get('dictionary_table'))
+
+        # Columns and statements used on every batch or record
+        self._value_column = getattr(self.source_model, self._value_field)
+        self._load_columns = self._record_columns()
+        self._junction_insert = None
+        if self._multiple_values:
+            mapping = self.etl_config['junction_mapping']
+            self._junction_model = self.models[self.etl_config['junction_table']]
+            self._junction_insert = self._junction_model.__table__.insert()
+            self._junction_fields = (mapping['source_field'], mapping['target_field'])
+            self._junction_source_column = getattr(self._junction_model, mapping['source_field'])
+        else:
+            self._mapping_id_column = getattr(self.source_model, self._mapping_id_field)
     
     def _init_ai_matcher(self):
         with self.db_manager.session_scope() as session:
             items = session.query(
                 self.target_model.id,
                 self.target_model.name
-            ).all()
-            
-            self.existing_options = [name for _, name in items]
+            ).yield_per(5000)
+
+            # Single streamed pass; also builds the in-memory lookups so
+            # direct matching never needs a query
+            option_ids = []
+            self.existing_options = []
+            self.name_to_id = {}
+            self.norm_name_to_id = {}
+            for id, name in items:
+                option_ids.append(id)
+                self.existing_options.append(name)
+                self.name_to_id[name] = id
+                self.norm_name_to_id.setdefault(_lookup_key(name), id)
+
             self.ai_matcher = AIMatcherService(
                 existing_options=self.existing_options,
                 logger=self.logger,
-                config=self.config
+                config=self.config,
+                option_ids=option_ids
             )
-            self.id_map = {idx: id for idx, (id, _) in enumerate(items)}
+            self._match_cache = {}
+
+            self.synonym_to_id = {}
+            # Keys published since the last commit, dropped if it fails
+            self._uncommitted_synonyms = []
+            if self.dict_model is not None:
+                synonyms = session.query(self.dict_model.name, self.dict_model.table_name_id).filter(
+                    self.dict_model.table_name == self.etl_config['table_name']
+                ).yield_per(10000)
+                for name, target_id in synonyms:
+                    self.synonym_to_id.setdefault(_lookup_key(name), target_id)
 
     def run(self):
         self.monitoring.start_run()
@@ -72,6 +159,7 @@ class GenericETL:
             batch_size = self.settings.get('batch_size', 1000)
             max_iterations = self.settings.get('max_iterations', 1)
             progress_interval = self.settings.get('progress_interval', 50)
+            commit_interval = self.settings.get('commit_interval', progress_interval)
 
             self.logger.info(
                 f"Starting {self.etl_type} ETL process with "
@@ -80,41 +168,54 @@ class GenericETL:
             
             processed_total = 0
             iteration = 0
+            last_id = None
 
             while iteration < max_iterations:
                 with self.db_manager.session_scope() as session:
                     session.autoflush = False
+                    session.expire_on_commit = False
                     
                     self.logger.info(f"Fetching batch {iteration + 1}")
-                    unmapped_records = self.get_unmapped_records(session, batch_size)
+                    unmapped_records = self.get_unmapped_records(session, batch_size, last_id)
                     records = unmapped_records.all()
 
                     if not records:
                         self.logger.info("No more unmapped records to process")
                         break
+                    last_id = records[-1].id
 
                     self.logger.info(f"Processing {len(records)} records")
                     processed_in_batch = 0
+                    uncommitted_ids = []
+
+                    try:
+                        self._prefetch_ai_matches(records)
+                    except Exception as e:
+                        self.logger.warning(f"Batched AI matching failed, matching per record: {e}")
 
                     for i, record in enumerate(records, 1):
                         try:
-                            with self.db_manager.session_scope() as record_session:
-                                fresh_record = record_session.merge(record)
-                                if self._process_record(record_session, fresh_record):
-                                    processed_in_batch += 1
-                                
-                                if i % progress_interval == 0:
-                                    self.logger.info(
-                                        f"Processed {i}/{len(records)} "
-                                        f"records in current batch"
-                                    )
+                            if self._process_record(session, record):
+                                processed_in_batch += 1
+                                uncommitted_ids.append(record.id)
                         except Exception as e:
                             self.logger.error(
                                 f"Error processing record "
                                 f"{getattr(record, 'id', 'unknown')}: {e}"
                             )
-                            continue
 
+                        # Records are isolated by savepoints; commit in groups
+                        if i % commit_interval == 0:
+                            processed_in_batch -= self._commit_group(session, uncommitted_ids)
+                            uncommitted_ids = []
+
+                        if i % progress_interval == 0:
+                            self.logger.info(
+                                f"Processed {i}/{len(records)} "
+                                f"records in current batch"
+                            )
+
+                    processed_in_batch -= self._commit_group(session, uncommitted_ids)
                     processed_total += processed_in_batch
                     iteration += 1
                     
@@ -132,162 +233,267 @@ class GenericETL:
             self.monitoring.end_run()
             self.logger.info(f"ETL process completed. Total records processed: {processed_total}")
 
-    def get_unmapped_records(self, session, batch_size: int):
-        if self.etl_config.get('multiple_values', False):
-            junction_model = self.models[self.etl_config['junction_table']]
-            mapping = self.etl_config['junction_mapping']
-            source_field = mapping['source_field']
-            
-            subquery = session.query(junction_model).filter(
-                getattr(junction_model, source_field) == self.source_model.id
+    def _record_columns(self) -> List[Any]:
+        """Source columns read while processing a record."""
+        field_names = ['id', self.etl_config['value_field']]
+        if 'mapping_id_field' in self.etl_config:
+            field_names.append(self.etl_config['mapping_id_field'])
+        for context_field in self.etl_config.get('context_fields', []):
+            if context_field['field'] not in field_names:
+                field_names.append(context_field['field'])
+        return [getattr(self.source_model, name) for name in field_names]
+
+    def get_unmapped_records(self, session, batch_size: int, last_id: Optional[int] = None):
+        """Query the next page of unmapped records in primary key order.
+
+        Args:
+            session: Database session
+            batch_size: Maximum records to return
+            last_id: Highest record ID of the previous page, if any
+
+        Returns:
+            Query object
+        """
+        if self._multiple_values:
+            subquery = session.query(self._junction_model).filter(
+                self._junction_source_column == self.source_model.id
             ).exists()
-            return session.query(self.source_model).filter(
-                ~subquery,
-                getattr(self.source_model, self.etl_config['value_field']).isnot(None)
-            ).limit(batch_size)
+            conditions = [~subquery, self._value_column.isnot(None)]
         else:
-            return session.query(self.source_model).filter(
-                getattr(self.source_model, self.etl_config['mapping_id_field']).is_(None),
-                getattr(self.source_model, self.etl_config['value_field']).isnot(None)
-            ).limit(batch_size)
+            conditions = [
+                self._mapping_id_column.is_(None),
+                self._value_column.isnot(None)
+            ]
+
+        # Keyset pagination: records left unmapped are not fetched again
+        if last_id is not None:
+            conditions.append(self.source_model.id > last_id)
+
+        return session.query(self.source_model).options(
+            load_only(*self._load_columns)
+        ).filter(*conditions).order_by(self.source_model.id).limit(batch_size)
 
     def _process_record(self, session, record):
         start_time = time.time()
-        value_field = self.etl_config['value_field']
-        raw_value = getattr(record, value_field, None)
+        raw_value = getattr(record, self._value_field, None)
         if not raw_value:
             return False
 
         matched_ids = []
+        new_synonyms = {}
+        context = None
         try:
-            for value in self._split_values(raw_value):
-                if not self.is_valid_value(value):
-                    self.logger.info(f"Skipping invalid value: '{value}'")
-                    continue
-
-                match_result = self._find_direct_match(session, value)
-                if match_result:
-                    matched_ids.append(match_result)
-                    self.monitoring.record_match('direct')
-                else:
-                    context = self._get_context(record)
-                    match_result = self.ai_matcher.find_best_match(value, context)
+            # Savepoint so a failing record never rolls back the batch transaction
+            with session.begin_nested():
+                values = []
+                for value in self._split_values(raw_value):
+                    if not self.is_valid_value(value):
+                        self.logger.info(f"Skipping invalid value: '{value}'")
+                        continue
+                    values.append(value)
+
+                direct_matches = self._find_direct_matches(values)
+                for value in values:
+                    match_result = direct_matches.get(value)
                     if match_result:
-                        actual_id = self.id_map[match_result.id]
-                        matched_ids.append(actual_id)
-                        self.monitoring.record_match('ai')
-                        self._add_synonym(session, value, actual_id, match_result.confidence)
+                        matched_ids.append(match_result)
+                        self.monitoring.record_match('direct')
+                    else:
+                        if context is None:
+                            context = self._get_context(record)
+                        match_result = self._find_ai_match(value, context)
+                        if match_result:
+                            matched_ids.append(match_result.id)
+                            self.monitoring.record_match('ai')
+                            key = self._add_synonym(session, value, match_result.id, match_result.confidence)
+                            if key is not None:
+                                new_synonyms[key] = match_result.id
+
+                if matched_ids:
+                    if self._multiple_values:
+                        source_field, target_field = self._junction_fields
+                        rows = [
+                            {source_field: record.id, target_field: target_id}
+                            for target_id in matched_ids
+                        ]
+                        session.execute(self._junction_insert, rows)
+                    else:
+                        setattr(record, self._mapping_id_field, matched_ids[0])
+                        session.add(record)
+
+                    session.flush()
+
+            # Only synonyms whose savepoint was released reach the lookup
+            if new_synonyms:
+                self.synonym_to_id.update(new_synonyms)
+                self._uncommitted_synonyms.extend(new_synonyms)
 
             if matched_ids:
-                if self.etl_config.get('multiple_values', False):
-                    junction_model = self.models[self.etl_config['junction_table']]
-                    mapping = self.etl_config['junction_mapping']
-                    for target_id in matched_ids:
-                        junction = junction_model(
-                            **{
-                                mapping['source_field']: record.id,
-                                mapping['target_field']: target_id
-                            }
-                        )
-                        session.add(junction)
-                else:
-                    setattr(record, self.etl_config['mapping_id_field'], matched_ids[0])
-                    session.add(record)
-
-                session.commit()
                 self.monitoring.record_success(time.time() - start_time)
                 return True
 
         except Exception as e:
             self.logger.error(f"Error processing record {getattr(record, 'id', 'unknown')}: {e}")
             self.monitoring.record_error('processing', str(e), str(getattr(record, 'id', 'unknown')))
-            session.rollback()
             return False
 
         return False
 
     def _split_values(self, raw_value: str):
-        if not self.etl_config.get('multiple_values', False):
+        if self._split_re is None:
             return [raw_value]
-        separator = self.etl_config.get('value_separator', '[/,]')
-        return [val.strip() for val in re.split(separator, raw_value) if val.strip()]
+        return [val for val in self._split_re.split(raw_value.strip()) if val]
 
     def _get_context(self, record):
         context = {}
-        for context_field in self.etl_config.get('context_fields', []):
-            field_name = context_field['field']
+        for field_name, weight in self._context_fields:
             field_value = getattr(record, field_name, '')
             if field_value:
-                context[field_name] = {
-                    'value': str(field_value),
-                    'weight': context_field.get('weight', 1.0)
-                }
+                context[field_name] = {'value': str(field_value), 'weight': weight}
         return context
 
-    def _find_direct_match(self, session, value):
-        try:
-            match = session.query(self.target_model).filter(
-                self.target_model.name == value
-            ).first()
-            if match:
-                return match.id
-
-            if 'dictionary_table' in self.etl_config:
-                synonym = session.query(self.models[self.etl_config['dictionary_table']]).filter(
-                    self.models[self.etl_config['dictionary_table']].table_name == self.etl_config['table_name'],
-                    self.models[self.etl_config['dictionary_table']].name == value
-                ).first()
-                if synonym:
-                    return synonym.table_name_id
+    def _find_direct_match(self, value: str) -> Optional[int]:
+        if value in self.name_to_id:
+            return self.name_to_id[value]
+        key = _lookup_key(value)
+        return self.norm_name_to_id.get(key) or self.synonym_to_id.get(key)
+
+    def _find_direct_matches(self, values: List[str]) -> Dict[str, int]:
+        matches = {}
+        for value in values:
+            target_id = self._find_direct_match(value)
+            if target_id is not None:
+                matches[value] = target_id
+        return matches
+
+    def _match_cache_key(self, value: str, context: Dict[str, Any]) -> tuple:
+        return (
+            value.strip().casefold(),
+            tuple(sorted((field, content['value']) for field, content in context.items()))
+        )
+
+    def _cache_match(self, key: tuple, match_result) -> None:
+        if len(self._match_cache) >= self.settings.get('match_cache_size', 10000):
+            # Evict the oldest entry; dicts keep insertion order
+            del self._match_cache[next(iter(self._match_cache))]
+        self._match_cache[key] = match_result
+
+    def _find_ai_match(self, value: str, context: Dict[str, Any]):
+        """Run AI matching, reusing the result for a value already seen with the same context."""
+        key = self._match_cache_key(value, context)
+        if key in self._match_cache:
+            return self._match_cache[key]
+
+        match_result = self.ai_matcher.find_best_match(value, context)
+        self._cache_match(key, match_result)
+        return match_result
+
+    def _prefetch_ai_matches(self, records) -> None:
+        """Run AI matching for every direct-match miss of a batch in one matcher call.
+
+        Results land in the match cache, where _process_record picks them up.
+        """
+        pending = {}
+        for record in records:
+            raw_value = getattr(record, self._value_field, None)
+            if not raw_value:
+                continue
+
+            misses = [
+                value for value in self._split_values(raw_value)
+                if self.is_valid_value(value) and self._find_direct_match(value) is None
+            ]
+            if not misses:
+                continue
+
+            context = self._get_context(record)
+            for value in misses:
+                key = self._match_cache_key(value, context)
+                if key not in self._match_cache:
+                    pending.setdefault(key, (value, context))
+
+        if not pending:
+            return
+
+        self.logger.info(f"Running AI matching for {len(pending)} values")
+        results = self.ai_matcher.find_best_matches(
+            [value for value, _ in pending.values()],
+            [context for _, context in pending.values()]
+        )
+        for key, match_result in zip(pending, results):
+            self._cache_match(key, match_result)
 
+    def _commit_group(self, session, record_ids: List[Any]) -> int:
+        """Commit the records written since the previous commit.
+
+        A failed commit is rolled back so the session stays usable for the
+        rest of the batch, and the synonyms published for the group are
+        removed from the lookup again.
+
+        Args:
+            session: Database session
+            record_ids: IDs of the records written since the previous commit
+
+        Returns:
+            Number of records lost to a failed commit
+        """
+        if not record_ids:
+            return 0
+        try:
+            session.commit()
+            return 0
         except Exception as e:
-            self.logger.error(f"Error in direct matching: {e}")
-            return None
+            session.rollback()
+            for key in self._uncommitted_synonyms:
+                self.synonym_to_id.pop(key, None)
+            self.logger.error(
+                f"Commit failed, rolled back {len(record_ids)} records "
+                f"{record_ids}: {e}"
+            )
+            self.monitoring.record_error('commit', str(e))
+            return len(record_ids)
+        finally:
+            self._uncommitted_synonyms.clear()
 
-        return None
+    def _add_synonym(self, session, value: str, target_id: int, confidence: float) -> Optional[str]:
+        """Write an AI match to the dictionary table inside the caller's savepoint.
 
-    def _add_synonym(self, session, value: str, target_id: int, confidence: float):
-        if 'dictionary_table' not in self.etl_config:
+        Returns:
+            Lookup key of the written synonym, for the caller to publish once
+            its savepoint is released; None if nothing was written
+        """
+        if self.dict_model is None:
             self.logger.warning("No dictionary_table configured in etl_config")
-            return
+            return None
                 
+        key = _lookup_key(value)
+        if key in self.synonym_to_id:
+            self.logger.debug(f"Synonym already exists: value='{value}'")
+            return None
+
         try:
-            self.logger.debug(f"Starting _add_synonym for value: {value}")
-            dict_model = self.models[self.etl_config['dictionary_table']]
-            
-            self.logger.debug(f"Checking for existing synonym with table_name={self.etl_config['table_name']}, value={value}")
-            existing = session.query(dict_model).filter(
-                dict_model.table_name == self.etl_config['table_name'],
-                func.trim(dict_model.name).collate('utf8mb4_general_ci') == value.strip()
-            ).first()
-
-            if not existing:
-                self.logger.info(f"Creating new synonym: value='{value}', table={self.etl_config['table_name']}, target_id={target_id}")
-                synonym = dict_model(
-                    table_name=self.etl_config['table_name'],
-                    table_name_id=target_id,
-                    name=value.strip(),
-                    ai_match_message=f"AI match with confidence {confidence:.4f}"
-                )
-                session.add(synonym)
-                session.commit()
-                self.logger.info(f"Successfully added synonym with id: {synonym.id}")
-            else:
-                self.logger.debug(f"Synonym already exists: id={existing.id}")
+            dict_model = self.dict_model
+            self.logger.info(f"Creating new synonym: value='{value}', table={self.etl_config['table_name']}, target_id={target_id}")
+            stmt = mysql_insert(dict_model).values(
+                table_name=self.etl_config['table_name'],
+                table_name_id=target_id,
+                name=value.strip(),
+                ai_match_message=f"AI match with confidence {confidence:.4f}"
+            )
+            # Keep an existing mapping if another run added the synonym meanwhile
+            stmt = stmt.on_duplicate_key_update(table_name_id=dict_model.table_name_id)
+            session.execute(stmt)
+            return key
 
         except Exception as e:
             self.logger.error(f"Error in _add_synonym: {str(e)}")
-            session.rollback()
             raise
 
     def is_valid_value(self, value: str):
         if not value:
             return False
 
-        validation = self.etl_config.get('validation', {})
-        if validation:
-            skip_pattern = validation.get('skip_if_matches')
-            if skip_pattern and re.match(skip_pattern, value.strip()):
-                return False
+        if self._skip_re is not None and self._skip_re.match(value.strip()):
+            return False
 
         return True
\ No newline at end of file
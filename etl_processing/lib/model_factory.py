@@ -1,13 +1,26 @@
 """Factory for creating SQLAlchemy models dynamically from YAML configuration."""
 
-from typing import Dict, Any, Type
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Any, Type, Tuple
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Index
 from sqlalchemy.orm import declarative_base
-import yaml
+from ..utils.config_loader import load_yaml_config
 import uuid
 
 Base = declarative_base()
 
+# Length of varchar(N) column types
+_VARCHAR_LENGTH_RE = re.compile(r'\((\d+)\)')
+
+# Model classes already built per (table name, table config digest)
+_TABLE_MODEL_CACHE: Dict[Tuple[str, str], Type] = {}
+
+# Models already built per (config path, modification time)
+_MODEL_CACHE: Dict[Tuple[str, float], Dict[str, Type]] = {}
+
 class ModelFactory:
     """Creates SQLAlchemy models dynamically from configuration."""
     
@@ -24,6 +37,8 @@ class ModelFactory:
     def create_model(cls, table_name: str, table_config: Dict[str, Any]) -> Type:
         """Creates a SQLAlchemy model class from configuration.
         
+        Identical table configurations return the same class.
+        
         Args:
             table_name: Name of the database table
             table_config: Table configuration dictionary
@@ -34,14 +49,22 @@ class ModelFactory:
         Raises:
             ValueError: If column type is not supported
         """
+        cache_key = (
+            table_name,
+            hashlib.sha1(json.dumps(table_config, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        )
+        cached = _TABLE_MODEL_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
         columns = {}
+        get_sql_type = cls.TYPE_MAPPING.get
         
         for col_name, col_config in table_config['columns'].items():
             col_type = col_config['type'].lower()
             
             if col_type.startswith('varchar'):
-                import re
-                length = int(re.search(r'\((\d+)\)', col_type).group(1))
+                length = int(_VARCHAR_LENGTH_RE.search(col_type).group(1))
                 col_type = 'varchar'
                 column = Column(
                     String(length),
@@ -50,7 +73,7 @@ class ModelFactory:
                     autoincrement=col_config.get('auto_increment', False)
                 )
             else:
-                sql_type = cls.TYPE_MAPPING.get(col_type)
+                sql_type = get_sql_type(col_type)
                 if not sql_type:
                     raise ValueError(f"Unsupported column type: {col_type}")
                 
@@ -71,32 +94,50 @@ class ModelFactory:
             
             columns[col_name] = column
 
+        # Tables are extended on every call; only declare indexes not already attached
+        existing_table = Base.metadata.tables.get(table_config['name'])
+        existing_indexes = {index.name for index in existing_table.indexes} if existing_table is not None else set()
+        indexes = tuple(
+            Index(index_name, *index_config['columns'], unique=index_config.get('unique', False))
+            for index_name, index_config in table_config.get('indexes', {}).items()
+            if index_name not in existing_indexes
+        )
+
         # Generate unique class name using uuid
         unique_id = str(uuid.uuid4()).replace('-', '')
         class_name = f"Dynamic{table_name}Model_{unique_id}"
         
-        return type(
+        model = type(
             class_name,
             (Base,),
             {
                 '__tablename__': table_config['name'],
-                '__table_args__': {'extend_existing': True},
+                '__table_args__': (*indexes, {'extend_existing': True}),
                 **columns
             }
         )
+        _TABLE_MODEL_CACHE[cache_key] = model
+        return model
 
     @classmethod
     def load_models(cls, config_path: str) -> Dict[str, Type]:
         """Loads all models from configuration file.
         
+        Models are built once per configuration file version and reused
+        by later calls.
+        
         Args:
             config_path: Path to YAML configuration
             
         Returns:
             Dictionary mapping table names to model classes
         """
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        cache_key = (os.path.abspath(config_path), os.path.getmtime(config_path))
+        cached = _MODEL_CACHE.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+        config = load_yaml_config(config_path)
             
         models = {}
         
@@ -133,10 +174,17 @@ class ModelFactory:
                         'type': 'text',
                         'nullable': True
                     }
+                },
+                'indexes': {
+                    'uq_dicosynonymes_table_name_name': {
+                        'columns': ['table_name', 'name'],
+                        'unique': True
+                    }
                 }
             }
             
         for table_name, table_config in config['database']['tables'].items():
             models[table_name] = cls.create_model(table_name, table_config)
-            
-        return models
\ No newline at end of file
+
+        _MODEL_CACHE[cache_key] = models
+        return dict(models)
\ No newline at end of file
@@ -3,8 +3,8 @@
 
 import sys
 import os
-import yaml
 from .etl.generic import GenericETL
+from .utils.config_loader import load_yaml_config
 
 def main():
     """Execute ETL process based on command line arguments."""
@@ -14,8 +14,7 @@ def main():
 
     # Load ETL configuration
     try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        config = load_yaml_config(config_path)
     except Exception as e:
         print(f"Error loading configuration: {e}")
         return
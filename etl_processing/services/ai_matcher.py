@@ -1,16 +1,77 @@
 # services/ai_matcher.py
 """AI-based text matching service using sentence transformers for fuzzy matching."""
 
-from typing import List, Dict, Optional, NamedTuple, Union
-from sentence_transformers import SentenceTransformer, util
-import torch
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
+import os
+from typing import List, Dict, Optional, NamedTuple, Tuple, Union
 import numpy as np
 import logging
+import re
 import unicodedata
 from ..utils.text_processor import TextProcessor
 
+# Medical term mappings
+MEDICAL_TERM_MAPPINGS = {
+    'tibia perone': 'jambe',
+    'femur': 'jambe',
+    'rachis cervical': 'cou',
+    'rachis lombaire': 'dos',
+    'rachis dorsal': 'dos'
+}
+
+# Finds every mapped term in a single scan
+MEDICAL_TERM_PATTERN = re.compile('|'.join(
+    re.escape(term) for term in sorted(MEDICAL_TERM_MAPPINGS, key=len, reverse=True)
+))
+
+# Option rows upcast per step when scoring reduced-precision embeddings
+OPTION_CHUNK_ROWS = 4096
+
+# Common French diacritics, folded without a unicodedata round-trip
+DIACRITIC_TABLE = str.maketrans('àâäáãåéèêëíìïîóòôöõúùûüýÿçñ', 'aaaaaaeeeeiiiiooooouuuuyycn')
+
+@lru_cache(maxsize=65536)
+def _normalize_medical_term_cached(text: str) -> Tuple[str, str]:
+    """Lowercase and ASCII-fold a term, then append mapped common terms.
+
+    Args:
+        text: Medical term to normalize
+
+    Returns:
+        Tuple of (folded text, folded text with mapped common terms)
+    """
+    text = TextProcessor.normalize_text(text)
+    if not text.isascii():
+        text = text.translate(DIACRITIC_TABLE)
+        # Anything the table does not cover goes through the full NFKD fold
+        if not text.isascii():
+            text = unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('ASCII')
+
+    found = set(MEDICAL_TERM_PATTERN.findall(text))
+    if not found:
+        return text, text
+    return text, ' '.join([text] + [
+        common_term
+        for medical_term, common_term in MEDICAL_TERM_MAPPINGS.items()
+        if medical_term in found
+    ])
+
+def __getattr__(name: str):
+    # torch and sentence-transformers take seconds to import, so they load
+    # when a matcher is built rather than when the package is imported
+    if name == 'SentenceTransformer':
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _sentence_transformer_class():
+    """Model class, honouring a module-level override such as a test patch."""
+    return globals().get('SentenceTransformer') or __getattr__('SentenceTransformer')
+
 class MatchResult(NamedTuple):
-    """Result of AI matching containing matched ID, confidence score and value."""
+    """Result of AI matching containing matched option ID, confidence score and value."""
     id: int
     confidence: float
     matched_value: str
@@ -21,7 +82,8 @@ class AIMatcherService:
         existing_options: List[str], 
         model_name: str = 'paraphrase-multilingual-MiniLM-L12-v2',
         logger: Optional[logging.Logger] = None,
-        config: Optional[dict] = None
+        config: Optional[dict] = None,
+        option_ids: Optional[List[int]] = None
     ):
         """Initialize matcher with existing reference values and model.
         
@@ -30,14 +92,30 @@ class AIMatcherService:
             model_name: Sentence transformer model name
             logger: Optional logger instance
             config: Optional configuration dict
+            option_ids: Optional IDs of the options, returned in MatchResult.id.
+                Defaults to the option positions.
         """
         self.logger = logger or logging.getLogger(__name__)
         self.config = config or {}
+        self.option_ids = list(option_ids) if option_ids is not None else list(range(len(existing_options)))
+        self._embedding_cache = OrderedDict()
+        self._embedding_cache_size = self.config.get('ai', {}).get('cache_size', 16384)
         
         self.logger.info(f"Initializing AI matcher with model: {model_name}")
         
         try:
-            self.model = SentenceTransformer(model_name)
+            ai_config = self.config.get('ai', {})
+            self._configure_threads(ai_config.get('threads'))
+            device = ai_config.get('device') or self._detect_device()
+            self.logger.info(f"Loading model on device: {device}")
+            model_kwargs = {'device': device}
+            if ai_config.get('backend'):
+                # e.g. 'onnx' for CPU deployments (requires optimum/onnxruntime)
+                model_kwargs['backend'] = ai_config['backend']
+            self.model = _sentence_transformer_class()(model_name, **model_kwargs)
+            self.model.eval()
+            if ai_config.get('fp16') and device == 'cuda':
+                self.model.half()
         except Exception as e:
             self.logger.error(f"Failed to load SentenceTransformer: {e}")
             self.model = None
@@ -52,12 +130,80 @@ class AIMatcherService:
         self.logger.info("Computing embeddings for normalized options")
         
         try:
-            self.option_embeddings = self._compute_safe_embeddings(self.normalized_options)
+            self.option_embeddings = self._load_or_compute_embeddings(model_name, self.normalized_options)
             self.logger.info("Embeddings computed successfully")
         except Exception as e:
             self.logger.error(f"Failed to compute embeddings: {e}")
             self.option_embeddings = None
 
+    def _configure_threads(self, threads: Optional[int]) -> None:
+        """Set torch intra-op threads for CPU inference.
+
+        Args:
+            threads: Number of intra-op threads; torch defaults are kept when None
+        """
+        if not threads:
+            return
+        import torch
+        torch.set_num_threads(threads)
+        try:
+            # Encodes are issued one at a time, so inter-op parallelism only adds overhead
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Can only be set once per process, before any parallel work
+            pass
+        self.logger.info(f"Using {threads} torch threads")
+
+    @staticmethod
+    def _detect_device() -> str:
+        """Return the fastest available torch device: CUDA, then MPS, then CPU."""
+        import torch
+        if torch.cuda.is_available():
+            return 'cuda'
+        mps = getattr(torch.backends, 'mps', None)
+        if mps is not None and mps.is_available():
+            return 'mps'
+        return 'cpu'
+
+    def _load_or_compute_embeddings(self, model_name: str, options: List[str]) -> np.ndarray:
+        """Load option embeddings from the disk cache, computing them on a miss.
+
+        The cache is enabled by ai.cache_dir; files are keyed on the model
+        name, storage dtype and options, and memory-mapped read-only.
+
+        Args:
+            model_name: Sentence transformer model name
+            options: Normalized text options to embed
+
+        Returns:
+            NumPy array of embeddings
+        """
+        ai_config = self.config.get('ai', {})
+        cache_dir = ai_config.get('cache_dir')
+        if not cache_dir:
+            return self._compute_safe_embeddings(options)
+
+        key = hashlib.sha1('\n'.join(
+            [model_name, ai_config.get('embedding_dtype', 'float32')] + options
+        ).encode('utf-8')).hexdigest()
+        cache_path = os.path.join(cache_dir, f"embeddings_{key}.npy")
+
+        if os.path.exists(cache_path):
+            self.logger.info(f"Loading cached embeddings from {cache_path}")
+            return np.load(cache_path, mmap_mode='r')
+
+        embeddings = self._compute_safe_embeddings(options)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write then rename so concurrent runs never read a partial file
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, embeddings)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            self.logger.warning(f"Could not cache embeddings: {e}")
+        return embeddings
+
     def _compute_safe_embeddings(self, options: List[str]) -> np.ndarray:
         """Safely compute embeddings with robust error handling.
         
@@ -68,10 +214,7 @@ class AIMatcherService:
             NumPy array of embeddings
         """
         try:
-            embeddings = self.model.encode(
-                options,
-                convert_to_tensor=False
-            )
+            embeddings = self._encode(options)
             
             # Ensure NumPy array with proper dimensions
             if not isinstance(embeddings, np.ndarray):
@@ -80,11 +223,38 @@ class AIMatcherService:
             if embeddings.ndim != 2:
                 raise ValueError(f"Unexpected embedding dimensions: {embeddings.ndim}")
             
-            return embeddings
+            # Unit rows make cosine similarity a plain dot product; re-normalizing
+            # is a cheap guard for models that ignore normalize_embeddings.
+            # Optionally store at reduced precision (e.g. float16 halves memory)
+            dtype = self.config.get('ai', {}).get('embedding_dtype', 'float32')
+            # C-contiguous (N, D) rows, so the transposed matmul maps straight onto GEMM
+            return np.ascontiguousarray(self._normalize_rows(embeddings), dtype=dtype)
         except Exception as e:
             self.logger.error(f"Embedding computation error: {e}")
             raise
 
+    def _encode(self, texts: Union[str, List[str]]) -> np.ndarray:
+        """Embed texts with the configured batch size.
+
+        sentence-transformers sorts inputs by length before batching, so
+        a larger batch keeps padding low on vocabularies of mixed length.
+
+        Args:
+            texts: Text or list of texts to embed
+
+        Returns:
+            NumPy array of unit-length embeddings
+        """
+        import torch
+        with torch.inference_mode():
+            return self.model.encode(
+                texts,
+                batch_size=self.config.get('ai', {}).get('batch_size', 64),
+                convert_to_tensor=False,
+                show_progress_bar=False,
+                normalize_embeddings=True
+            )
+
     def _normalize_medical_term(self, text: str) -> str:
         """Normalize medical terms by mapping specific terms to common forms.
         
@@ -97,25 +267,10 @@ class AIMatcherService:
         Example:
             'tibia perone' -> 'tibia perone jambe'
         """
-        text = TextProcessor.normalize_text(text)
-        text = unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('ASCII')
-        
-        # Medical term mappings
-        medical_mappings = {
-            'tibia perone': 'jambe',
-            'femur': 'jambe',
-            'rachis cervical': 'cou',
-            'rachis lombaire': 'dos',
-            'rachis dorsal': 'dos'
-        }
-        
-        original_text = text
-        for medical_term, common_term in medical_mappings.items():
-            if medical_term in text:
-                text = f"{text} {common_term}"
+        original_text, text = _normalize_medical_term_cached(text)
                 
         if text != original_text:
-            self.logger.debug(f"Normalized term: '{text}' (original: '{original_text}')")
+            self.logger.debug("Normalized term: '%s' (original: '%s')", text, original_text)
             
         return text
 
@@ -135,66 +290,198 @@ class AIMatcherService:
         Returns:
             MatchResult if match found above threshold, None otherwise
         """
+        return self.find_best_matches([value], [context], similarity_threshold)[0]
+
+    def find_best_matches(
+        self,
+        values: List[str],
+        contexts: Optional[List[Dict[str, Union[str, Dict[str, Union[str, float]]]]]] = None,
+        similarity_threshold: Optional[float] = None
+    ) -> List[Optional[MatchResult]]:
+        """Find best matching options for several input values at once.
+
+        All query texts go through a single encode call. Similarities are
+        scored in blocks of ai.match_block_size queries so the score matrix
+        stays bounded for large batches.
+
+        Args:
+            values: Values to find matches for
+            contexts: Optional weighted context values, one per value
+            similarity_threshold: Optional custom threshold
+
+        Returns:
+            List with a MatchResult or None for each value
+        """
         # Check if AI matching is possible
         if self.model is None or self.option_embeddings is None:
             self.logger.warning("AI matcher not properly initialized. Skipping matching.")
-            return None
+            return [None] * len(values)
+
+        if not values:
+            return []
+
+        contexts = contexts or [{}] * len(values)
 
         try:
             similarity_threshold = similarity_threshold or self.config.get('ai', {}).get('similarity_threshold', 0.7)
-            self.logger.info(f"Finding best match for: '{value}'")
             
             # Process context and weights
-            enhanced_value = self._enhance_value_with_context(value, context)
-            self.logger.info(f"Enhanced value: '{enhanced_value}'")
-            
-            # Compute embedding for query
-            query_embedding = self.model.encode(enhanced_value, convert_to_tensor=False)
-            
-            # Compute similarities
-            similarities = util.pytorch_cos_sim(
-                torch.from_numpy(query_embedding), 
-                torch.from_numpy(self.option_embeddings)
-            )[0].numpy()
-            
-            # Apply context-based boosting if weights are provided
-            similarities = self._apply_context_weights(similarities, context)
+            enhanced_values = []
+            for value, context in zip(values, contexts):
+                self.logger.info("Finding best match for: '%s'", value)
+                enhanced_value = self._enhance_value_with_context(value, context)
+                self.logger.info("Enhanced value: '%s'", enhanced_value)
+                enhanced_values.append(enhanced_value)
             
-            # Find best matches
-            top_k = min(3, len(similarities))
-            top_indices = np.argsort(similarities)[-top_k:][::-1]
+            # Encode queries and context values together, in one call
+            context_values = self._collect_context_values(contexts)
+            embeddings = self._encode_cached(enhanced_values + context_values)
+            query_embeddings = embeddings[:len(enhanced_values)]
+            context_embeddings = embeddings[len(enhanced_values):]
+            context_rows = {value: row for row, value in enumerate(context_values)}
             
-            self.logger.info(f"Top {top_k} matches:")
-            for idx in top_indices:
-                self.logger.info(
-                    f"  - '{self.existing_options[idx]}' "
-                    f"(similarity: {similarities[idx]:.4f})"
-                )
-            
-            best_index = int(top_indices[0])
-            best_similarity = float(similarities[best_index])
-            
-            if best_similarity >= similarity_threshold:
-                self.logger.info(
-                    f"Match found: '{self.existing_options[best_index]}' "
-                    f"(similarity: {best_similarity:.4f})"
+            block_size = self.config.get('ai', {}).get('match_block_size', 256)
+            results = []
+            for start in range(0, len(enhanced_values), block_size):
+                block = slice(start, start + block_size)
+                similarities = self._cos_sim(query_embeddings[block])
+                
+                # Only this block's context values are scored, so memory stays
+                # bounded by the block rather than by the whole batch
+                block_values = self._collect_context_values(contexts[block])
+                block_similarities = None
+                if block_values:
+                    block_similarities = self._cos_sim(
+                        context_embeddings[[context_rows[value] for value in block_values]]
+                    )
+                
+                # Apply context-based boosting if weights are provided
+                similarities = self._apply_batch_context_weights(
+                    similarities, contexts[block], block_similarities, block_values
                 )
-                return MatchResult(
-                    id=best_index,
-                    confidence=best_similarity,
-                    matched_value=self.existing_options[best_index]
+                results.extend(
+                    self._select_match(row, similarity_threshold)
+                    for row in similarities
                 )
-            
-            self.logger.info(
-                f"No match found above threshold ({similarity_threshold}). "
-                f"Best similarity: {best_similarity:.4f}"
-            )
-            return None
+            return results
             
         except Exception as e:
             self.logger.error(f"Error in AI matching: {e}")
             self.logger.exception("Full traceback:")
-            return None
+            return [None] * len(values)
+
+    def _encode_cached(self, texts: List[str]) -> np.ndarray:
+        """Encode texts, reusing embeddings of recently seen texts.
+
+        Only texts missing from the LRU cache are passed to the model,
+        in a single encode call.
+
+        Args:
+            texts: Query texts to embed
+
+        Returns:
+            Matrix with one embedding row per text
+        """
+        missing = [text for text in dict.fromkeys(texts) if text not in self._embedding_cache]
+        if missing:
+            for text, embedding in zip(missing, self._encode(missing)):
+                self._embedding_cache[text] = embedding
+                if len(self._embedding_cache) > self._embedding_cache_size:
+                    self._embedding_cache.popitem(last=False)
+
+        embeddings = []
+        for text in texts:
+            embedding = self._embedding_cache.get(text)
+            if embedding is None:
+                # Evicted within this call when the cache is smaller than the batch
+                embedding = self._encode(text)
+            else:
+                self._embedding_cache.move_to_end(text)
+            embeddings.append(embedding)
+        return np.array(embeddings)
+
+    @staticmethod
+    def _normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+        """Scale embeddings to unit L2 norm.
+
+        Args:
+            embeddings: One embedding or a matrix of embeddings
+
+        Returns:
+            float32 matrix with one unit-length row per embedding
+        """
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.clip(norms, 1e-12, None)
+
+    def _cos_sim(self, query_embeddings: np.ndarray) -> np.ndarray:
+        """Cosine similarity of query embeddings against all option embeddings.
+
+        Args:
+            query_embeddings: One embedding or a matrix of embeddings
+
+        Returns:
+            Similarity matrix with one row per query
+        """
+        queries = self._normalize_rows(query_embeddings)
+        options = self.option_embeddings
+        # Option embeddings are pre-normalized; scores come out as float32
+        if options.dtype == np.float32:
+            return queries @ options.T
+
+        # Reduced-precision options: NumPy has no BLAS kernel for float16, and
+        # a mixed matmul would upcast the whole matrix on every call. Upcast a
+        # bounded slice of option rows at a time into one reused buffer.
+        scores = np.empty((len(queries), len(options)), dtype=np.float32)
+        buffer = np.empty((min(OPTION_CHUNK_ROWS, len(options)), options.shape[1]), dtype=np.float32)
+        for start in range(0, len(options), OPTION_CHUNK_ROWS):
+            rows = buffer[:len(options[start:start + OPTION_CHUNK_ROWS])]
+            rows[...] = options[start:start + len(rows)]
+            scores[:, start:start + len(rows)] = queries @ rows.T
+        return scores
+
+    def _select_match(self, similarities: np.ndarray, similarity_threshold: float) -> Optional[MatchResult]:
+        """Pick the best option from one row of similarity scores.
+
+        Args:
+            similarities: Similarity scores against every option
+            similarity_threshold: Minimum similarity for a match
+
+        Returns:
+            MatchResult if best score reaches threshold, None otherwise
+        """
+        # Find best matches: partial selection, then sort only the top K
+        top_k = min(3, len(similarities))
+        candidates = np.argpartition(similarities, -top_k)[-top_k:]
+        top_indices = candidates[np.argsort(-similarities[candidates])]
+        
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("Top %d matches:", top_k)
+            for idx in top_indices:
+                self.logger.info(
+                    "  - '%s' (similarity: %.4f)",
+                    self.existing_options[idx], similarities[idx]
+                )
+        
+        best_index = int(top_indices[0])
+        best_similarity = float(similarities[best_index])
+        
+        if best_similarity >= similarity_threshold:
+            self.logger.info(
+                "Match found: '%s' (similarity: %.4f)",
+                self.existing_options[best_index], best_similarity
+            )
+            return MatchResult(
+                id=self.option_ids[best_index],
+                confidence=best_similarity,
+                matched_value=self.existing_options[best_index]
+            )
+        
+        self.logger.info(
+            "No match found above threshold (%s). Best similarity: %.4f",
+            similarity_threshold, best_similarity
+        )
+        return None
 
     def _enhance_value_with_context(
         self, 
@@ -220,21 +507,20 @@ class AIMatcherService:
                     normalized_value = TextProcessor.normalize_text(field_value)
                     context_parts.append(normalized_value)
                     self.logger.debug(
-                        f"Added context field '{field}' "
-                        f"with value '{normalized_value}' "
-                        f"and weight {content.get('weight', 1.0)}"
+                        "Added context field '%s' with value '%s' and weight %s",
+                        field, normalized_value, content.get('weight', 1.0)
                     )
             else:
                 if content:
                     normalized_value = TextProcessor.normalize_text(content)
                     context_parts.append(normalized_value)
                     self.logger.debug(
-                        f"Added context field '{field}' "
-                        f"with value '{normalized_value}'"
+                        "Added context field '%s' with value '%s'",
+                        field, normalized_value
                     )
         
         enhanced_value = " ".join(context_parts)
-        self.logger.debug(f"Enhanced value: '{enhanced_value}'")
+        self.logger.debug("Enhanced value: '%s'", enhanced_value)
         return enhanced_value
 
     def _apply_context_weights(
@@ -251,28 +537,69 @@ class AIMatcherService:
         Returns:
             Updated similarity scores with context weights applied
         """
-        weighted_similarities = similarities.copy()
+        return self._apply_batch_context_weights(similarities[np.newaxis, :], [context])[0]
+
+    def _apply_batch_context_weights(
+        self,
+        similarities: np.ndarray,
+        contexts: List[Dict[str, Union[str, Dict[str, Union[str, float]]]]],
+        context_similarities: Optional[np.ndarray] = None,
+        context_values: Optional[List[str]] = None
+    ) -> np.ndarray:
+        """Apply weighted contexts to a matrix of similarity scores.
+
+        Args:
+            similarities: Base similarity scores, one row per query
+            contexts: Context with weights, one per row
+            context_similarities: Precomputed similarities of context_values,
+                encoded on demand when omitted
+            context_values: Values scored in context_similarities; defaults
+                to those returned by _collect_context_values
+
+        Returns:
+            Updated similarity scores with context weights applied
+        """
+        if context_values is None:
+            context_values = self._collect_context_values(contexts)
+        if not context_values:
+            return similarities.copy()
+
+        if context_similarities is None:
+            context_similarities = self._cos_sim(self._encode_cached(context_values))
+        value_columns = {value: column for column, value in enumerate(context_values)}
+
+        # One row of normalized field weights per query, one column per value
+        weights = np.zeros((len(contexts), len(context_values)), dtype=np.float32)
+        for row, context in enumerate(contexts):
+            # Get total weight for normalization
+            total_weight = sum(
+                content.get('weight', 1.0)
+                for content in context.values()
+                if isinstance(content, dict)
+            ) or 1.0
+            
+            for field, content in context.items():
+                if isinstance(content, dict) and content.get('value'):
+                    weight = content.get('weight', 1.0) / total_weight
+                    weights[row, value_columns[content['value']]] += weight
+                    
+                    self.logger.debug(
+                        "Applied weight %s to context field '%s'", weight, field
+                    )
         
-        # Get total weight for normalization
-        total_weight = sum(
-            content.get('weight', 1.0)
+        # Single BLAS matmul for all fields, base scores added in place
+        weighted_similarities = weights @ context_similarities
+        weighted_similarities += similarities
+        return weighted_similarities
+
+    @staticmethod
+    def _collect_context_values(
+        contexts: List[Dict[str, Union[str, Dict[str, Union[str, float]]]]]
+    ) -> List[str]:
+        """Return the distinct non-empty context values, in first-seen order."""
+        return list(dict.fromkeys(
+            content['value']
+            for context in contexts
             for content in context.values()
-            if isinstance(content, dict)
-        ) or 1.0
-        
-        # Apply weights
-        for field, content in context.items():
-            if isinstance(content, dict) and content.get('value'):
-                weight = content.get('weight', 1.0) / total_weight
-                query_embedding = self.model.encode(content['value'], convert_to_tensor=False)
-                context_similarities = util.pytorch_cos_sim(
-                    torch.from_numpy(query_embedding), 
-                    torch.from_numpy(self.option_embeddings)
-                )[0].numpy()
-                weighted_similarities += context_similarities * weight
-                
-                self.logger.debug(
-                    f"Applied weight {weight} to context field '{field}'"
-                )
-        
-        return weighted_similarities
\ No newline at end of file
+            if isinstance(content, dict) and content.get('value')
+        ))
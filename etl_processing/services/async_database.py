@@ -0,0 +1,177 @@
+# services/async_database.py
+"""Asynchronous database connection and operations manager.
+
+Requires the optional async dependencies: pip install etl_processing[async]
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+import logging
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from dotenv import load_dotenv
+from .database import update_statement
+from typing import Optional, Any
+
+class AsyncDatabaseManager:
+    """Manages asyncio database connections and CRUD operations.
+
+    Counterpart of DatabaseManager for async callers, so queries do not
+    block the event loop. The sync manager remains the one used by the CLI.
+
+    Concurrency is bounded at session_scope: at most pool_size +
+    max_overflow sessions are open at once, so tasks spawned without limit
+    wait for a slot instead of exhausting the pool. Methods taking a
+    session run inside such a scope and do not acquire a slot again.
+    """
+
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        pool_size: int = 10,
+        max_overflow: int = 20
+    ) -> None:
+        """Initialize database connection using environment variables.
+
+        Args:
+            logger: Optional custom logger
+            pool_size: Connections kept in the pool
+            max_overflow: Extra connections allowed under load
+        """
+        load_dotenv()
+        self.logger = logger or logging.getLogger(__name__)
+
+        db_user = os.getenv('MYSQL_USER')
+        db_pass = os.getenv('MYSQL_PASSWORD')
+        db_host = os.getenv('MYSQL_HOST')
+        db_name = os.getenv('MYSQL_DATABASE')
+
+        connection_string = f'mysql+aiomysql://{db_user}:{db_pass}@{db_host}/{db_name}?charset=utf8mb4'
+
+        try:
+            self.engine = create_async_engine(
+                connection_string,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_recycle=3600,
+                pool_pre_ping=True,
+                isolation_level='READ_COMMITTED'
+            )
+            self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+            # Never queue more sessions on the pool than it can serve
+            self._session_slots = asyncio.Semaphore(pool_size + max_overflow)
+            self.logger.info("Async database connection established successfully")
+        except Exception as e:
+            self.logger.error(f"Failed to establish async database connection: {e}")
+            raise
+
+    @asynccontextmanager
+    async def session_scope(self):
+        """Provide a transactional scope around operations.
+
+        Yields:
+            Async database session
+        """
+        async with self._session_slots:
+            async with self.Session() as session:
+                try:
+                    yield session
+                    await session.commit()
+                except Exception as e:
+                    await session.rollback()
+                    self.logger.error(f"Database transaction failed: {e}")
+                    raise
+
+    async def update_record(
+        self,
+        session: Any,
+        record_id: int,
+        table_name: str,
+        field: str,
+        value: Any,
+        max_retries: int = 3
+    ) -> bool:
+        """Update a record with retry logic.
+
+        Args:
+            session: Async database session
+            record_id: ID of record to update
+            table_name: Name of table containing record
+            field: Field to update
+            value: New value
+            max_retries: Maximum retry attempts
+
+        Returns:
+            True if update successful
+        """
+        stmt = update_statement(table_name, field)
+
+        for attempt in range(max_retries):
+            try:
+                await session.execute(stmt, {'value': value, 'id': record_id})
+                await session.commit()
+                return True
+            except SQLAlchemyError as e:
+                await session.rollback()
+                if attempt < max_retries - 1:
+                    self.logger.warning(
+                        f"Retry {attempt + 1}/{max_retries} updating "
+                        f"{table_name} record {record_id}: {e}"
+                    )
+                else:
+                    self.logger.error(
+                        f"Failed to update {table_name} record {record_id} "
+                        f"after {max_retries} attempts: {e}"
+                    )
+            except Exception as e:
+                await session.rollback()
+                self.logger.error(
+                    f"Unexpected error updating {table_name} record {record_id}: {e}"
+                )
+                return False
+
+        return False
+
+    async def add_synonym(
+        self,
+        session: Any,
+        synonym_model: Any,
+        value: str,
+        target_table: str,
+        target_id: int,
+        message: Optional[str] = None
+    ) -> bool:
+        """Add new synonym if it doesn't exist.
+
+        Args:
+            session: Async database session
+            synonym_model: Synonym model class
+            value: Synonym value
+            target_table: Target table name
+            target_id: Target record ID
+            message: Optional message (e.g., AI match details)
+
+        Returns:
+            True if the synonym is stored, False on error
+        """
+        try:
+            # Same upsert as DatabaseManager.add_synonym
+            stmt = mysql_insert(synonym_model).values(
+                table_name=target_table,
+                table_name_id=target_id,
+                name=value.strip(),
+                ai_match_message=message
+            )
+            stmt = stmt.on_duplicate_key_update(table_name_id=synonym_model.table_name_id)
+            await session.execute(stmt)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error adding synonym: {e}")
+            await session.rollback()
+            return False
+
+    async def dispose(self) -> None:
+        """Close all pooled connections."""
+        await self.engine.dispose()
@@ -1,8 +1,8 @@
 # services/batch_optimizer.py
 """Batch size optimization for ETL processing based on performance metrics."""
+from collections import deque
 from dataclasses import dataclass
-from typing import List
-import numpy as np
+from typing import Deque, Optional, Tuple
 
 @dataclass
 class BatchStats:
@@ -11,12 +11,49 @@ class BatchStats:
     processing_time: float
 
 class BatchOptimizer:
-    """Optimizes ETL batch sizes based on processing metrics."""
-    def __init__(self, initial_size: int = 1000, min_size: int = 100, max_size: int = 5000):
+    """Optimizes ETL batch sizes based on processing metrics.
+
+    Sizes follow AIMD: a fixed step up while batches are healthy and under
+    the processing-time SLO, a 10% cut when they are not. After a cut, growth
+    bisects towards the size that breached, so the size settles instead of
+    oscillating; growth also pauses while processing times are too noisy to
+    trust.
+    """
+    BACKOFF = 0.9
+    NOISE_WINDOW = 10
+    MAX_NOISE_COV = 0.5
+    PROBE_INTERVAL = 10
+    FIT_INTERVAL = 10
+    STRATEGIES = ('aimd', 'regression')
+
+    def __init__(self, initial_size: int = 1000, min_size: int = 100, max_size: int = 5000,
+                 max_history: int = 10000, slo: float = 30.0, step: int = 100,
+                 strategy: str = 'aimd'):
+        """
+        Args:
+            strategy: 'aimd', or 'regression' to also jump, on every healthy
+                FIT_INTERVAL-th call, to the size a linear latency model
+                predicts meets the SLO
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unsupported batch strategy: {strategy}")
+        self.strategy = strategy
         self.current_size = initial_size
         self.min_size = min_size
         self.max_size = max_size
-        self.history: List[BatchStats] = []
+        self.slo = slo
+        self.step = step
+        # Most recent batches only; averages cover this window
+        self.history: Deque[BatchStats] = deque(maxlen=max_history)
+        self._adjustments = 0
+        self._success_rate_sum = 0.0
+        self._processing_time_sum = 0.0
+        self._recent_times: Deque[float] = deque(maxlen=self.NOISE_WINDOW)
+        # Size of the last batch that breached, and calls spent settled below it
+        self._breach_size: Optional[int] = None
+        self._settled_calls = 0
+        # Least-squares sums of processing time on size, over the history window
+        self._sx = self._sy = self._sxx = self._sxy = 0.0
         
     def adjust_size(self, success_rate: float, processing_time: float) -> int:
         """Adjust batch size based on performance metrics.
@@ -28,15 +65,91 @@ class BatchOptimizer:
         Returns:
             New batch size
         """
-        self.history.append(BatchStats(self.current_size, success_rate, processing_time))
+        size = self.current_size
+        history = self.history
+        if len(history) == history.maxlen:
+            evicted = history[0]
+            self._success_rate_sum -= evicted.success_rate
+            self._processing_time_sum -= evicted.processing_time
+            self._sx -= evicted.size
+            self._sy -= evicted.processing_time
+            self._sxx -= evicted.size * evicted.size
+            self._sxy -= evicted.size * evicted.processing_time
+        history.append(BatchStats(size, success_rate, processing_time))
+        self._adjustments += 1
+        self._success_rate_sum += success_rate
+        self._processing_time_sum += processing_time
+        self._recent_times.append(processing_time)
+        self._sx += size
+        self._sy += processing_time
+        self._sxx += size * size
+        self._sxy += size * processing_time
         
-        # More aggressive scaling factors
-        if success_rate > 0.95 and processing_time < 30:
-            self.current_size = min(int(self.current_size * 1.25), self.max_size)
-        elif success_rate < 0.8 or processing_time > 60:
-            self.current_size = max(int(self.current_size * 0.5), self.min_size)
+        if success_rate < 0.8 or processing_time > 2 * self.slo:
+            # Multiplicative decrease, always honoured
+            self._breach_size = size
+            self._settled_calls = 0
+            size = max(int(size * self.BACKOFF), self.min_size)
+        elif success_rate > 0.95 and processing_time < self.slo and not self._noisy():
+            model_size = None
+            if self.strategy == 'regression' and self._adjustments % self.FIT_INTERVAL == 0:
+                model_size = self._model_size()
+            size = self._grow(size) if model_size is None else model_size
+        else:
+            return size
             
-        return self.current_size
+        self.current_size = size
+        return size
+
+    def _grow(self, size: int) -> int:
+        target = size + self.step
+        breach = self._breach_size
+        if breach is not None and target >= breach:
+            # Bisect towards the size that last breached
+            target = (size + breach) // 2
+            if target <= size:
+                # Settled just below it; re-probe upwards once in a while
+                self._settled_calls += 1
+                if self._settled_calls < self.PROBE_INTERVAL:
+                    return size
+                self._breach_size = None
+                self._settled_calls = 0
+                target = size + self.step
+        return min(target, self.max_size)
+
+    def fit_latency_model(self) -> Optional[Tuple[float, float]]:
+        """Least-squares fit of processing time against batch size.
+        
+        Covers the batches still in history, so stale latency ages out.
+        
+        Returns:
+            (slope, intercept), or None until sizes have varied
+        """
+        n = len(self.history)
+        spread = n * self._sxx - self._sx * self._sx
+        if n < 2 or spread <= 0:
+            return None
+        slope = (n * self._sxy - self._sx * self._sy) / spread
+        intercept = (self._sy - slope * self._sx) / n
+        return slope, intercept
+
+    def _model_size(self) -> Optional[int]:
+        model = self.fit_latency_model()
+        if model is None or model[0] <= 0:
+            return None
+        slope, intercept = model
+        size = int((self.slo - intercept) / slope)
+        return min(max(size, self.min_size), self.max_size)
+
+    def _noisy(self) -> bool:
+        times = self._recent_times
+        if len(times) < self.NOISE_WINDOW // 2:
+            return False
+        mean = sum(times) / len(times)
+        if mean <= 0:
+            return False
+        variance = sum((t - mean) ** 2 for t in times) / len(times)
+        return variance ** 0.5 / mean > self.MAX_NOISE_COV
         
     def get_stats(self):
         """Return optimizer statistics.
@@ -48,8 +161,8 @@ class BatchOptimizer:
             return None
             
         return {
-            'avg_success_rate': np.mean([s.success_rate for s in self.history]),
-            'avg_processing_time': np.mean([s.processing_time for s in self.history]),
-            'size_changes': len(self.history),
+            'avg_success_rate': self._success_rate_sum / len(self.history),
+            'avg_processing_time': self._processing_time_sum / len(self.history),
+            'size_changes': self._adjustments,
             'current_size': self.current_size
         }
\ No newline at end of file
@@ -2,6 +2,7 @@
 """Command-line reporting utilities for ETL processes."""
 from typing import Dict
 from datetime import datetime
+import logging
 
 
 class CLIReporter:
@@ -15,6 +16,9 @@ class CLIReporter:
         Args:
             metrics: Dictionary of ETL metrics
         """
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+
         report = f"""
 ETL Process Report
 -----------------
@@ -45,8 +49,7 @@ Performance:
         Returns:
             Formatted duration string
         """
-        duration = end - start
-        hours = duration.seconds // 3600
-        minutes = (duration.seconds % 3600) // 60
-        seconds = duration.seconds % 60
+        # total_seconds() keeps whole days, which timedelta.seconds drops
+        minutes, seconds = divmod(int((end - start).total_seconds()), 60)
+        hours, minutes = divmod(minutes, 60)
         return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
\ No newline at end of file
@@ -2,13 +2,61 @@
 """Database connection and operations manager."""
 
 import os
+import re
+import threading
 from contextlib import contextmanager
+from functools import lru_cache
 import logging
-from sqlalchemy import create_engine, func, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 from dotenv import load_dotenv
-from typing import Optional, Any
+from typing import Optional, Any, Iterable, Tuple
+
+_IDENTIFIER_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+@lru_cache(maxsize=256)
+def update_statement(table_name: str, field: str):
+    """Build, once per table and field, the single-field UPDATE by id.
+
+    Args:
+        table_name: Name of table containing records
+        field: Field to update
+
+    Returns:
+        Reusable text() statement with :value and :id parameters
+
+    Raises:
+        ValueError: If table or field is not a plain SQL identifier
+    """
+    for identifier in (table_name, field):
+        if not _IDENTIFIER_RE.match(identifier):
+            raise ValueError(f"Invalid SQL identifier: {identifier!r}")
+    return text(f"UPDATE {table_name} SET {field} = :value WHERE id = :id")
+
+@lru_cache(maxsize=None)
+def get_engine(connection_string: str):
+    """Return the process-wide engine for a connection string.
+
+    Every DatabaseManager on the same database shares one connection pool.
+
+    Args:
+        connection_string: SQLAlchemy database URL
+
+    Returns:
+        SQLAlchemy engine
+    """
+    return create_engine(
+        connection_string,
+        pool_size=10,
+        max_overflow=20,
+        pool_recycle=3600,
+        pool_pre_ping=True,
+        isolation_level='READ_COMMITTED',
+        # Room for every per-table statement of a run; the default is 500
+        query_cache_size=1200
+    )
 
 class DatabaseManager:
     """Manages database connections and CRUD operations."""
@@ -28,19 +76,16 @@ class DatabaseManager:
         db_pass = os.getenv('MYSQL_PASSWORD')
         db_host = os.getenv('MYSQL_HOST')
         db_name = os.getenv('MYSQL_DATABASE')
+        # mysqlclient (mysqldb) is C-based; 'mysqlconnector' remains available
+        db_driver = os.getenv('MYSQL_DRIVER', 'mysqldb')
 
-        connection_string = f'mysql+mysqlconnector://{db_user}:{db_pass}@{db_host}/{db_name}'
+        connection_string = f'mysql+{db_driver}://{db_user}:{db_pass}@{db_host}/{db_name}?charset=utf8mb4'
         
         try:
-            self.engine = create_engine(
-                connection_string,
-                pool_size=10,
-                max_overflow=20,
-                pool_recycle=3600,
-                pool_pre_ping=True,
-                isolation_level='READ_COMMITTED'
-            )
-            self.Session = sessionmaker(bind=self.engine)
+            self.engine = get_engine(connection_string)
+            # One session per thread; session_scope removes it when done
+            self.Session = scoped_session(sessionmaker(bind=self.engine))
+            self._scope = threading.local()
             self.logger.info("Database connection established successfully")
         except Exception as e:
             self.logger.error(f"Failed to establish database connection: {e}")
@@ -53,10 +98,15 @@ class DatabaseManager:
         table_name: str, 
         field: str, 
         value: Any, 
-        max_retries: int = 3
+        max_retries: int = 3,
+        commit: bool = True
     ) -> bool:
         """Update a record with retry logic.
 
+        With commit=False the update joins the caller's transaction, e.g.
+        one ``session.begin()`` block around a whole batch, and each attempt
+        runs in a savepoint so a retry leaves earlier updates intact.
+
         Args:
             session: Database session
             record_id: ID of record to update
@@ -64,24 +114,30 @@ class DatabaseManager:
             field: Field to update
             value: New value
             max_retries: Maximum retry attempts
+            commit: Commit after the update; False leaves it to the caller
 
         Returns:
             True if update successful
         """
-        stmt = text(f"UPDATE {table_name} SET {field} = :value WHERE id = :id")
+        stmt = update_statement(table_name, field)
         
         for attempt in range(max_retries):
             try:
-                session.execute(stmt, {'value': value, 'id': record_id})
-                session.commit()
+                if commit:
+                    session.execute(stmt, {'value': value, 'id': record_id})
+                    session.commit()
+                else:
+                    with session.begin_nested():
+                        session.execute(stmt, {'value': value, 'id': record_id})
                 self.logger.info(
-                    f"Successfully updated {table_name} record {record_id} "
-                    f"{field} to {value}"
+                    "Successfully updated %s record %s %s to %s",
+                    table_name, record_id, field, value
                 )
                 return True
                 
             except SQLAlchemyError as e:
-                session.rollback()
+                if commit:
+                    session.rollback()
                 if attempt < max_retries - 1:
                     self.logger.warning(
                         f"Retry {attempt + 1}/{max_retries} updating "
@@ -95,7 +151,8 @@ class DatabaseManager:
                     )
                     return False
             except Exception as e:
-                session.rollback()
+                if commit:
+                    session.rollback()
                 self.logger.error(
                     f"Unexpected error updating {table_name} record {record_id}: {e}"
                 )
@@ -103,14 +160,80 @@ class DatabaseManager:
                 
         return False
     
+    def update_records_bulk(
+        self,
+        session: Any,
+        table_name: str,
+        field: str,
+        updates: Iterable[Tuple[int, Any]],
+        batch_size: int = 500,
+        max_retries: int = 3
+    ) -> int:
+        """Update many records with one executemany statement per batch.
+
+        Each batch is committed once and retried as a whole.
+
+        Args:
+            session: Database session
+            table_name: Name of table containing records
+            field: Field to update
+            updates: (record ID, new value) pairs
+            batch_size: Records per statement and commit
+            max_retries: Maximum retry attempts per batch
+
+        Returns:
+            Number of records updated
+        """
+        stmt = update_statement(table_name, field)
+        params = [{'value': value, 'id': record_id} for record_id, value in updates]
+        updated = 0
+        
+        for start in range(0, len(params), batch_size):
+            batch = params[start:start + batch_size]
+            for attempt in range(max_retries):
+                try:
+                    session.execute(stmt, batch)
+                    session.commit()
+                    updated += len(batch)
+                    break
+                except SQLAlchemyError as e:
+                    session.rollback()
+                    if attempt < max_retries - 1:
+                        self.logger.warning(
+                            f"Retry {attempt + 1}/{max_retries} updating "
+                            f"{len(batch)} {table_name} records: {e}"
+                        )
+                    else:
+                        self.logger.error(
+                            f"Failed to update {len(batch)} {table_name} records "
+                            f"after {max_retries} attempts: {e}"
+                        )
+                        return updated
+        
+        self.logger.info("Updated %d %s records %s", updated, table_name, field)
+        return updated
+
     @contextmanager
     def session_scope(self):
         """Provide a transactional scope around operations.
 
+        A scope nested in another on the same thread gets the same registry
+        session and joins the outer transaction: only the outermost scope
+        commits, rolls back and removes the session.
+
         Yields:
             Database session
         """
         session = self.Session()
+        depth = getattr(self._scope, 'depth', 0)
+        self._scope.depth = depth + 1
+        if depth:
+            try:
+                yield session
+            finally:
+                self._scope.depth = depth
+            return
+
         try:
             yield session
             session.commit()
@@ -119,7 +242,8 @@ class DatabaseManager:
             self.logger.error(f"Database transaction failed: {e}")
             raise
         finally:
-            session.close()
+            self._scope.depth = 0
+            self.Session.remove()
 
     def query_table(
         self, 
@@ -161,6 +285,10 @@ class DatabaseManager:
     ) -> bool:
         """Add new synonym if it doesn't exist.
 
+        The affected-row count cannot tell a new synonym from an existing
+        one (SQLAlchemy's MySQL dialects enable CLIENT_FOUND_ROWS), so both
+        count as stored.
+
         Args:
             session: Database session
             synonym_model: Synonym model class
@@ -170,28 +298,23 @@ class DatabaseManager:
             message: Optional message (e.g., AI match details)
 
         Returns:
-            True if added, False if exists
+            True if the synonym is stored, False on error
         """
         try:
-            existing = session.query(synonym_model).filter(
-                synonym_model.table_name == target_table,
-                func.trim(synonym_model.name).collate('utf8mb4_general_ci') == value.strip()
-            ).first()
+            # One round-trip: on the unique (table_name, name) index an
+            # existing synonym keeps its mapping. Unlike INSERT IGNORE, other
+            # errors (truncation, NOT NULL) still raise
+            stmt = mysql_insert(synonym_model).values(
+                table_name=target_table,
+                table_name_id=target_id,
+                name=value.strip(),
+                ai_match_message=message
+            )
+            stmt = stmt.on_duplicate_key_update(table_name_id=synonym_model.table_name_id)
+            session.execute(stmt)
             
-            if not existing:
-                new_synonym = synonym_model(
-                    table_name=target_table,
-                    table_name_id=target_id,
-                    name=value.strip(),
-                    ai_match_message=message
-                )
-                session.add(new_synonym)
-                session.flush()
-                self.logger.info(f"Added new synonym: '{value}' -> {target_table}.{target_id}")
-                return True
-                
-            self.logger.info(f"Synonym already exists: '{value}' -> {target_table}.{target_id}")
-            return False
+            self.logger.info("Stored synonym: '%s' -> %s.%s", value, target_table, target_id)
+            return True
             
         except Exception as e:
             self.logger.error(f"Error adding synonym: {e}")
@@ -1,9 +1,11 @@
 # services/error_handler.py
 from typing import Optional, Dict, Any, Callable
+from collections import deque
 from functools import wraps
+import time
 import traceback
-from datetime import datetime
-import json
+from datetime import datetime, timedelta
+from ..utils.json_writer import encode_json, write_json
 
 class ETLError(Exception):
    def __init__(self, message: str, error_code: str, details: Optional[Dict[str, Any]] = None):
@@ -20,6 +22,12 @@ class MappingError(ETLError):
 class DatabaseError(ETLError):
    pass
 
+ERROR_TYPES = {
+   ValidationError: 'validation',
+   MappingError: 'mapping',
+   DatabaseError: 'database'
+}
+
 def with_error_handling(error_type: str, monitoring_service=None):
    def decorator(func: Callable):
        @wraps(func)
@@ -42,15 +50,18 @@ def with_error_handling(error_type: str, monitoring_service=None):
                        error_msg=error_msg,
                        record_id=getattr(args[0], 'id', None) if args else None
                    )
+               # Summarized like ErrorHandler entries: no frames kept alive,
+               # formatted with ''.join(details['traceback'].format()) when read
                raise ETLError(error_msg, error_type, {
                    'original_error': str(e),
-                   'traceback': traceback.format_exc()
-               })
+                   'traceback': traceback.TracebackException.from_exception(e, lookup_lines=False)
+               }) from e
        return wrapper
    return decorator
 
 class ErrorHandler:
-   def __init__(self, logger, monitoring_service=None):
+   def __init__(self, logger, monitoring_service=None, stream_path: Optional[str] = None,
+                max_history: int = 10000):
        self.logger = logger
        self.monitoring_service = monitoring_service
        self.error_handlers = {
@@ -58,33 +69,47 @@ class ErrorHandler:
            'mapping': self._handle_mapping_error,
            'database': self._handle_database_error
        }
-       self.error_history = []
+       # Only the most recent errors stay in memory; stream_path keeps them all
+       self.error_history = deque(maxlen=max_history)
        self.error_counts = {}
+       self.total_errors = 0
+       self.stream_path = stream_path
+       self._stream = None
+       # Wall-clock anchor; entries store cheap monotonic offsets from it
+       self._clock_start = datetime.now()
+       self._clock_start_ns = time.monotonic_ns()
 
    def handle_error(self, error: Exception, context: Dict[str, Any] = None) -> bool:
        error_type = self._classify_error(error)
        handler = self.error_handlers.get(error_type)
        
-       self.error_history.append({
-           'timestamp': datetime.now(),
+       entry = {
+           'elapsed_ns': time.monotonic_ns() - self._clock_start_ns,
            'type': error_type,
            'message': str(error),
            'context': context,
-           'traceback': traceback.format_exc()
-       })
+           # Frame summaries without locals or source lines: the history
+           # keeps no frames alive, and formatting waits for the report
+           'error': traceback.TracebackException.from_exception(error, lookup_lines=False)
+       }
+       self.error_history.append(entry)
        self.error_counts[error_type] = self.error_counts.get(error_type, 0) + 1
+       self.total_errors += 1
+       if self.stream_path:
+           self._write_stream(entry)
        
        if handler:
            return handler(error, context)
        return False
 
    def _classify_error(self, error: Exception) -> str:
-       if isinstance(error, ValidationError):
-           return 'validation'
-       if isinstance(error, MappingError):
-           return 'mapping'
-       if isinstance(error, DatabaseError):
-           return 'database'
+       # Exact class first; subclasses fall back to isinstance
+       error_type = ERROR_TYPES.get(type(error))
+       if error_type is not None:
+           return error_type
+       for error_class, error_type in ERROR_TYPES.items():
+           if isinstance(error, error_class):
+               return error_type
        return 'unknown'
 
    def _handle_validation_error(self, error: Exception, context: Dict[str, Any]) -> bool:
@@ -105,17 +130,36 @@ class ErrorHandler:
            self.monitoring_service.record_error('database', str(error))
        return False
 
+   def _report_entry(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+       report = {'timestamp': self._clock_start + timedelta(microseconds=entry['elapsed_ns'] / 1000)}
+       report.update((key, value) for key, value in entry.items() if key not in ('error', 'elapsed_ns'))
+       report['traceback'] = ''.join(entry['error'].format())
+       return report
+
+   def _write_stream(self, entry: Dict[str, Any]):
+       if self._stream is None:
+           self._stream = open(self.stream_path, 'ab', buffering=1 << 20)
+       self._stream.write(encode_json(self._report_entry(entry)) + b'\n')
+
+   def close(self):
+       if self._stream is not None:
+           self._stream.close()
+           self._stream = None
+
    def save_error_report(self):
+       if self.stream_path:
+           # Every error is already on disk; just flush what is buffered
+           self.close()
+           return
        if self.error_history:
            error_file = f"reports/errors/errors_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-           with open(error_file, 'w') as f:
-               json.dump({
-                   'error_counts': self.error_counts,
-                   'errors': self.error_history
-               }, f, indent=2, default=str)
+           write_json(error_file, {
+               'error_counts': self.error_counts,
+               'errors': [self._report_entry(entry) for entry in self.error_history]
+           })
 
    def get_error_summary(self) -> Dict:
        return {
-           'total_errors': len(self.error_history),
+           'total_errors': self.total_errors,
            'error_counts': self.error_counts
        }
\ No newline at end of file
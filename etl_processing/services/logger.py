@@ -1,12 +1,19 @@
 # services/logger.py
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 from typing import Optional, Dict
 
+# Background listeners started by setup_logging(use_queue=True), per logger name
+_listeners: Dict[str, logging.handlers.QueueListener] = {}
+
 def setup_logging(
     log_level: str = 'INFO', 
     log_file: Optional[str] = None, 
-    log_format: str = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    log_format: str = '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    use_queue: bool = False
 ) -> logging.Logger:
     """
     Configure and setup logging with console and optional file output
@@ -14,6 +21,8 @@ def setup_logging(
     :param log_level: Logging level (e.g., 'INFO', 'DEBUG', 'WARNING')
     :param log_file: Path to log file. If None, logs to console only
     :param log_format: Format of log messages
+    :param use_queue: Hand records to a background thread that writes them,
+        keeping console and file I/O off the calling thread
     :return: Configured logger instance
     
     Example format:
@@ -26,7 +35,9 @@ def setup_logging(
     logger = logging.getLogger('accidents_etl')
     logger.setLevel(getattr(logging, log_level))
 
-    # Clear any existing handlers
+    # Close any existing handlers, so repeated setup does not leak open files
+    stop_logging(logger)
+    _close_handlers(logger.handlers)
     logger.handlers.clear()
 
     # Create formatter
@@ -43,13 +54,54 @@ def setup_logging(
         # Ensure directory exists
         os.makedirs(os.path.dirname(log_file), exist_ok=True)
         
-        file_handler = logging.FileHandler(log_file)
+        # Bounded on disk, and written in batches unless an error needs flushing;
+        # the file is only opened once the first batch is written
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=64 * 1024 * 1024, backupCount=5, encoding='utf-8', delay=True
+        )
         file_handler.setLevel(getattr(logging, log_level))
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        buffered_handler = logging.handlers.MemoryHandler(
+            capacity=2048, flushLevel=logging.ERROR, target=file_handler
+        )
+        buffered_handler.setLevel(getattr(logging, log_level))
+        logger.addHandler(buffered_handler)
+
+    if use_queue:
+        sinks = list(logger.handlers)
+        logger.handlers.clear()
+        log_queue = queue.Queue(-1)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        listener = logging.handlers.QueueListener(log_queue, *sinks, respect_handler_level=True)
+        listener.start()
+        _listeners[logger.name] = listener
 
     return logger
 
+def stop_logging(logger: logging.Logger):
+    """Stop the logger's queue listener, writing out pending records.
+    
+    :param logger: Logger configured by setup_logging
+    """
+    listener = _listeners.pop(logger.name, None)
+    if listener is not None:
+        listener.stop()
+        _close_handlers(listener.handlers)
+
+def _close_handlers(handlers):
+    # Closing a MemoryHandler flushes it but leaves its target open
+    for handler in handlers:
+        target = getattr(handler, 'target', None)
+        handler.close()
+        if target is not None:
+            target.close()
+
+@atexit.register
+def _stop_all_listeners():
+    for listener in list(_listeners.values()):
+        listener.stop()
+    _listeners.clear()
+
 def log_timing_detail(logger: logging.Logger, metric_name: str, duration: float, context: Dict = None):
     """Log detailed timing information.
     
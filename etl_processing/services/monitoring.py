@@ -1,10 +1,130 @@
 # services/monitoring.py
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Dict, List
+from datetime import datetime, timedelta
+import random
+import time
+from typing import Dict, List, Optional
+import numpy as np
 from .cli_reporting import CLIReporter
 
-@dataclass
+# Per-record durations kept for inspection; older ones only count toward the mean
+PROCESSING_SAMPLE_WINDOW = 65536
+
+class SampleBuffer:
+    """Growable float64 array of samples with amortized O(1) appends.
+
+    A running total keeps the mean O(1) for frequent progress reports.
+    With max_size set, the buffer becomes a ring keeping only the most
+    recent samples, while total and mean still cover every sample.
+    """
+    __slots__ = ('_data', '_size', '_count', '_total', '_max_size')
+
+    def __init__(self, capacity: int = 1024, max_size: Optional[int] = None):
+        if max_size is not None:
+            capacity = min(capacity, max_size)
+        self._data = np.empty(capacity, dtype=np.float64)
+        self._size = 0
+        self._count = 0
+        self._total = 0.0
+        self._max_size = max_size
+
+    def append(self, value: float):
+        if self._size == len(self._data):
+            if self._max_size is not None and self._size == self._max_size:
+                # Full ring: overwrite the oldest sample
+                self._data[self._count % self._max_size] = value
+                self._count += 1
+                self._total += value
+                return
+            new_capacity = 2 * len(self._data)
+            if self._max_size is not None:
+                new_capacity = min(new_capacity, self._max_size)
+            grown = np.empty(new_capacity, dtype=np.float64)
+            grown[:self._size] = self._data
+            self._data = grown
+        self._data[self._size] = value
+        self._size += 1
+        self._count += 1
+        self._total += value
+
+    @property
+    def values(self) -> np.ndarray:
+        """Retained samples, oldest first (a view unless the ring wrapped)."""
+        if self._count == self._size:
+            return self._data[:self._size]
+        start = self._count % self._size
+        return np.concatenate((self._data[start:], self._data[:start]))
+
+    @property
+    def count(self) -> int:
+        """Number of samples ever appended."""
+        return self._count
+
+    @property
+    def total(self) -> float:
+        return self._total
+
+    def mean(self) -> float:
+        return self._total / self._count if self._count else 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __array__(self, dtype=None, copy=None):
+        return self.values if dtype is None else self.values.astype(dtype)
+
+class TimingStats:
+    """Online count/mean/min/max of one timing metric.
+
+    Aggregates are updated per call (Welford mean), so memory stays
+    O(metrics) rather than O(calls). Percentiles come from a fixed-size
+    reservoir sample, which is exact until it fills up.
+    """
+    __slots__ = ('count', 'mean', 'min', 'max', '_reservoir')
+
+    RESERVOIR_SIZE = 1024
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self._reservoir = np.empty(self.RESERVOIR_SIZE, dtype=np.float64)
+
+    def add(self, duration: float):
+        self.count += 1
+        self.mean += (duration - self.mean) / self.count
+        if duration < self.min:
+            self.min = duration
+        if duration > self.max:
+            self.max = duration
+        if self.count <= self.RESERVOIR_SIZE:
+            self._reservoir[self.count - 1] = duration
+        else:
+            slot = random.randrange(self.count)
+            if slot < self.RESERVOIR_SIZE:
+                self._reservoir[slot] = duration
+
+    def percentiles(self, q) -> np.ndarray:
+        return np.percentile(self._reservoir[:min(self.count, self.RESERVOIR_SIZE)], q)
+
+    def __len__(self) -> int:
+        return self.count
+
+@dataclass(slots=True)
+class ErrorRecord:
+    elapsed_ns: int  # Monotonic time since the monitoring clock started
+    type: str
+    message: str
+    record_id: Optional[str] = None
+
+@dataclass(slots=True)
 class ETLMetrics:
     start_time: datetime
     end_time: datetime = None
@@ -12,14 +132,26 @@ class ETLMetrics:
     records_failed: int = 0
     direct_matches: int = 0
     ai_matches: int = 0
-    processing_times: List[float] = field(default_factory=list)
+    processing_times: SampleBuffer = field(
+        default_factory=lambda: SampleBuffer(max_size=PROCESSING_SAMPLE_WINDOW))
     batch_sizes: List[int] = field(default_factory=list)
     error_counts: Dict[str, int] = field(default_factory=dict)
-    timings: Dict[str, List[float]] = field(default_factory=dict)
+    timings: Dict[str, TimingStats] = field(default_factory=dict)
 
     @property
     def avg_processing_time(self) -> float:
-        return sum(self.processing_times) / len(self.processing_times) if self.processing_times else 0
+        return self.processing_times.mean()
+
+    # Plain properties rather than cached_property: slots leave no instance
+    # dict to cache into, and the counters keep changing during a run
+    @property
+    def duration_seconds(self) -> float:
+        return (self.end_time - self.start_time).total_seconds()
+
+    @property
+    def success_rate(self) -> float:
+        total_records = self.records_processed + self.records_failed
+        return self.records_processed / total_records if total_records > 0 else 0
 
 class MonitoringService:
     """Service for tracking ETL metrics and performance."""
@@ -27,7 +159,10 @@ class MonitoringService:
         self.logger = logger
         self.reporter = CLIReporter(logger)
         self.current_run = None
-        self.error_history = []
+        self.error_history: List[ErrorRecord] = []
+        # Wall-clock anchor; events store cheap monotonic offsets from it
+        self._clock_start = datetime.now()
+        self._clock_start_ns = time.monotonic_ns()
 
     def start_run(self):
         """Initialize metrics for new ETL run."""
@@ -45,9 +180,10 @@ class MonitoringService:
         Args:
             processing_time: Operation duration
         """
-        if self.current_run:
-            self.current_run.records_processed += 1
-            self.current_run.processing_times.append(processing_time)
+        run = self.current_run
+        if run is not None:
+            run.records_processed += 1
+            run.processing_times.append(processing_time)
 
     def record_error(self, error_type: str, error_msg: str, record_id: str = None):
         """Record operation error.
@@ -57,15 +193,25 @@ class MonitoringService:
             error_msg: Error message
             record_id: Optional record identifier
         """
-        if self.current_run:
-            self.current_run.records_failed += 1
-            self.current_run.error_counts[error_type] = self.current_run.error_counts.get(error_type, 0) + 1
-            self.error_history.append({
-                'timestamp': datetime.now(),
-                'type': error_type,
-                'message': error_msg,
-                'record_id': record_id
-            })
+        run = self.current_run
+        if run is not None:
+            run.records_failed += 1
+            error_counts = run.error_counts
+            error_counts[error_type] = error_counts.get(error_type, 0) + 1
+            self.error_history.append(ErrorRecord(
+                elapsed_ns=time.monotonic_ns() - self._clock_start_ns,
+                type=error_type,
+                message=error_msg,
+                record_id=record_id
+            ))
+
+    def error_timestamp(self, record: ErrorRecord) -> datetime:
+        """Wall-clock time at which an error was recorded.
+        
+        Args:
+            record: Recorded error
+        """
+        return self._clock_start + timedelta(microseconds=record.elapsed_ns / 1000)
 
     def record_match(self, match_type: str):
         if not self.current_run:
@@ -77,9 +223,10 @@ class MonitoringService:
 
     def record_timing(self, metric_name: str, duration: float):
         if self.current_run:
-            if metric_name not in self.current_run.timings:
-                self.current_run.timings[metric_name] = []
-            self.current_run.timings[metric_name].append(duration)
+            stats = self.current_run.timings.get(metric_name)
+            if stats is None:
+                stats = self.current_run.timings[metric_name] = TimingStats()
+            stats.add(duration)
 
     def update_batch_size(self, size: int):
         if self.current_run:
@@ -89,14 +236,12 @@ class MonitoringService:
         if not self.current_run:
             return {}
 
-        total_records = self.current_run.records_processed + self.current_run.records_failed
         return {
             'start_time': self.current_run.start_time,
             'end_time': self.current_run.end_time,
             'processed': self.current_run.records_processed,
             'failed': self.current_run.records_failed,
-            'success_rate': (self.current_run.records_processed / total_records * 100 
-                           if total_records > 0 else 0),
+            'success_rate': self.current_run.success_rate * 100,
             'avg_processing_time': self.current_run.avg_processing_time,
             'current_batch_size': self.current_run.batch_sizes[-1] 
                                 if self.current_run.batch_sizes else 1000,
@@ -1,26 +1,74 @@
 # services/reporting.py
 """ETL process reporting and metrics output."""
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime
-import json
+import numpy as np
+from .monitoring import TimingStats
+from ..utils.json_writer import encode_json, write_json
 
 class ETLReport:
    """Handles generation and saving of ETL reports."""
-   def __init__(self, logger):
+   def __init__(self, logger, metrics_stream_path: Optional[str] = None):
        self.logger = logger
+       # When set, save_metrics appends one JSON line per call to this file
+       # instead of writing a new pretty-printed file each time
+       self.metrics_stream_path = metrics_stream_path
+       self._metrics_stream = None
 
-   def _format_timings(self, timings: Dict[str, List[float]]) -> str:
+   def _format_timings(self, timings: Dict[str, TimingStats]) -> str:
         result = []
         for name, times in timings.items():
-            avg = sum(times) / len(times)
-            min_time = min(times)
-            max_time = max(times)
-            result.append(f"{name}:\n  avg={avg:.3f}s min={min_time:.3f}s max={max_time:.3f}s")
+            stats = self._timing_stats(times)
+            result.append(
+                f"{name}:\n  avg={stats['avg']:.3f}s min={stats['min']:.3f}s "
+                f"max={stats['max']:.3f}s p95={stats['p95']:.3f}s p99={stats['p99']:.3f}s"
+            )
         return "\n".join(result)
 
+   def _timing_stats(self, times) -> Dict[str, float]:
+       if isinstance(times, TimingStats):
+           # Aggregated online; only the percentiles touch the reservoir
+           median, p95, p99 = times.percentiles([50, 95, 99]) if times.count else (0.0, 0.0, 0.0)
+           return {
+               'avg': times.mean,
+               'min': times.min if times.count else 0.0,
+               'max': times.max,
+               'p50': float(median),
+               'p95': float(p95),
+               'p99': float(p99),
+               'count': times.count
+           }
+       times = np.asarray(times, dtype=np.float64)
+       if times.size == 0:
+           return {'avg': 0.0, 'min': 0.0, 'max': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'count': 0}
+       # One partial sort yields min, median, tail percentiles and max together
+       minimum, median, p95, p99, maximum = np.percentile(times, [0, 50, 95, 99, 100])
+       return {
+           'avg': float(times.mean()),
+           'min': float(minimum),
+           'max': float(maximum),
+           'p50': float(median),
+           'p95': float(p95),
+           'p99': float(p99),
+           'count': len(times)
+       }
+
+   @staticmethod
+   def file_timestamp(now: Optional[datetime] = None) -> str:
+       """Format a report filename timestamp (YYYYmmdd_HHMMSS).
+
+       Compute it once per run and pass it to save_metrics/save_summary so
+       the files pair up. Formats fields directly, bypassing strftime.
+       """
+       now = now or datetime.now()
+       return (f"{now.year:04d}{now.month:02d}{now.day:02d}_"
+               f"{now.hour:02d}{now.minute:02d}{now.second:02d}")
+
    def _format_errors(self, error_counts: Dict[str, int]) -> str:
-       return "\n".join(f"{error}: {count}" for error, count in error_counts.items())
+       # Most frequent first; join sizes its buffer from a list in one pass
+       items = sorted(error_counts.items(), key=lambda item: -item[1])
+       return "\n".join([f"{error}: {count}" for error, count in items])
 
    def generate_summary(self, metrics) -> str:
        """Generate summary of ETL run.
@@ -31,21 +79,17 @@ class ETLReport:
        Returns:
            Formatted summary string
        """
-       duration = (metrics.end_time - metrics.start_time).total_seconds()
-       total_records = metrics.records_processed + metrics.records_failed
-       success_rate = metrics.records_processed/total_records if total_records > 0 else 0
-       
        return f"""
 ETL Summary Report
 -----------------
 Start Time: {metrics.start_time}
 End Time: {metrics.end_time}
-Duration: {duration:.2f}s
+Duration: {metrics.duration_seconds:.2f}s
 
 Records:
  Processed: {metrics.records_processed}
  Failed: {metrics.records_failed}
- Success Rate: {success_rate:.2%}
+ Success Rate: {metrics.success_rate:.2%}
 
 Timing Statistics:
 {self._format_timings(metrics.timings)}
@@ -54,52 +98,65 @@ Error Distribution:
 {self._format_errors(metrics.error_counts)}
 """
 
-   def save_metrics(self, metrics):
+   def save_metrics(self, metrics, timestamp: Optional[str] = None):
        """Save detailed metrics to file.
        
+       Appends one JSON line to metrics_stream_path when it is set.
+       
        Args:
            metrics: ETL metrics data
+           timestamp: Filename timestamp shared with the other report files
        """
-       metrics_file = f"reports/metrics/metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-       with open(metrics_file, 'w') as f:
-           json.dump({
-               'timings': {
-                   name: {
-                       'avg': sum(times)/len(times),
-                       'min': min(times),
-                       'max': max(times),
-                       'count': len(times)
-                   } for name, times in metrics.timings.items()
-               },
-               'error_counts': metrics.error_counts,
-               'batch_metrics': {
-                   'records_processed': metrics.records_processed,
-                   'records_failed': metrics.records_failed,
-                   'avg_processing_time': metrics.avg_processing_time,
-                   'total_duration': (metrics.end_time - metrics.start_time).total_seconds()
-               }
-           }, f, indent=2, default=str)
+       payload = {
+           'timings': {
+               name: self._timing_stats(times)
+               for name, times in metrics.timings.items()
+           },
+           'error_counts': metrics.error_counts,
+           'batch_metrics': {
+               'records_processed': metrics.records_processed,
+               'records_failed': metrics.records_failed,
+               'avg_processing_time': metrics.avg_processing_time,
+               'total_duration': metrics.duration_seconds
+           }
+       }
+       if self.metrics_stream_path:
+           self._write_metrics_line(payload)
+           return
+       metrics_file = f"reports/metrics/metrics_{timestamp or self.file_timestamp()}.json"
+       write_json(metrics_file, payload)
+
+   def _write_metrics_line(self, payload: Dict):
+       if self._metrics_stream is None:
+           self._metrics_stream = open(self.metrics_stream_path, 'ab', buffering=1 << 16)
+       self._metrics_stream.write(encode_json(payload))
+       self._metrics_stream.write(b'\n')
+
+   def close(self):
+       if self._metrics_stream is not None:
+           self._metrics_stream.close()
+           self._metrics_stream = None
 
-   def save_summary(self, metrics):
+   def save_summary(self, metrics, timestamp: Optional[str] = None):
        """Save run summary to file.
        
        Args:
            metrics: ETL metrics data
+           timestamp: Filename timestamp shared with the other report files
        """
-       summary_file = f"reports/summaries/summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-       with open(summary_file, 'w') as f:
-           json.dump({
-               'start_time': metrics.start_time.isoformat(),
-               'end_time': metrics.end_time.isoformat() if metrics.end_time else None,
-               'duration': (metrics.end_time - metrics.start_time).total_seconds(),
-               'success_rate': metrics.records_processed/(metrics.records_processed + metrics.records_failed)
-                   if (metrics.records_processed + metrics.records_failed) > 0 else 0,
-               'error_summary': metrics.error_counts,
-               'performance': {
-                   name: {'avg': sum(times)/len(times)}
-                   for name, times in metrics.timings.items()
-               }
-           }, f, indent=2, default=str)
+       summary_file = f"reports/summaries/summary_{timestamp or self.file_timestamp()}.json"
+       payload = {
+           'start_time': metrics.start_time.isoformat(),
+           'end_time': metrics.end_time.isoformat() if metrics.end_time else None,
+           'duration': metrics.duration_seconds,
+           'success_rate': metrics.success_rate,
+           'error_summary': metrics.error_counts,
+           'performance': {
+               name: {'avg': self._timing_stats(times)['avg']}
+               for name, times in metrics.timings.items()
+           }
+       }
+       write_json(summary_file, payload)
 
    def get_metrics_summary(self, metrics) -> Dict:
        """Get summary of key metrics.
@@ -113,7 +170,6 @@ Error Distribution:
        return {
            'total_processed': metrics.records_processed,
            'total_failed': metrics.records_failed,
-           'success_rate': metrics.records_processed/(metrics.records_processed + metrics.records_failed)
-               if (metrics.records_processed + metrics.records_failed) > 0 else 0,
+           'success_rate': metrics.success_rate,
            'avg_processing_time': metrics.avg_processing_time
        }
\ No newline at end of file
@@ -1,9 +1,12 @@
 # services/retry.py
 """Retry handling for failed ETL operations."""
+import threading
 import time
+from array import array
 from functools import wraps
 from typing import Callable, Optional, Type, Union, List, Dict
 import logging
+import numpy as np
 
 class RetryableError(Exception):
     """Base class for errors that should trigger retry."""
@@ -15,7 +18,8 @@ def with_retry(
     exceptions: tuple = (Exception,),
     backoff_factor: float = 2.0,
     max_delay: float = 30.0,
-    logger: Optional[logging.Logger] = None
+    logger: Optional[logging.Logger] = None,
+    cancel_event: Optional[threading.Event] = None
 ):
     """Retry decorator with exponential backoff.
     
@@ -26,11 +30,19 @@ def with_retry(
         backoff_factor: Multiplier for exponential backoff
         max_delay: Maximum delay between retries
         logger: Optional logger for retry attempts
+        cancel_event: Optional event; setting it cuts the current backoff
+            short and re-raises the last error without further attempts
     """
+    # The backoff sequence is fixed once the decorator is configured
+    delays = []
+    current_delay = delay
+    for _ in range(max_attempts - 1):
+        delays.append(current_delay)
+        current_delay = min(current_delay * backoff_factor, max_delay)
+
     def decorator(func: Callable):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            current_delay = delay
             last_error = None
             
             for attempt in range(max_attempts):
@@ -39,42 +51,62 @@ def with_retry(
                 except exceptions as e:
                     last_error = e
                     if attempt < max_attempts - 1:
-                        if logger:
+                        if logger is not None and logger.isEnabledFor(logging.WARNING):
                             logger.warning(
-                                f"Attempt {attempt + 1}/{max_attempts} failed: {str(e)}. "
-                                f"Retrying in {current_delay:.1f}s..."
+                                "Attempt %d/%d failed: %s. Retrying in %.1fs...",
+                                attempt + 1, max_attempts, e, delays[attempt]
                             )
-                        time.sleep(current_delay)
-                        current_delay = min(current_delay * backoff_factor, max_delay)
+                        if cancel_event is None:
+                            time.sleep(delays[attempt])
+                        elif cancel_event.wait(delays[attempt]):
+                            break
                         continue
-                    if logger:
-                        logger.error(f"All {max_attempts} attempts failed: {str(e)}")
+                    if logger is not None:
+                        logger.error("All %d attempts failed: %s", max_attempts, e)
             raise last_error
+        wrapper.retry_delays = tuple(delays)
         return wrapper
     return decorator
 
 class RetryTracker:
-    """Tracks retry statistics across operations."""
+    """Tracks retry statistics across operations.
+
+    Counters live in two parallel arrays indexed per operation, so an
+    attempt costs one dict lookup and no per-operation dict allocation.
+    """
     
     def __init__(self):
-        self.stats: Dict[str, Dict] = {}
+        self._index: Dict[str, int] = {}
+        self._attempts = array('Q')
+        self._failures = array('Q')
         
     def record_attempt(self, operation_name: str, success: bool):
-        if operation_name not in self.stats:
-            self.stats[operation_name] = {"attempts": 0, "failures": 0}
+        i = self._index.get(operation_name)
+        if i is None:
+            i = self._index[operation_name] = len(self._attempts)
+            self._attempts.append(0)
+            self._failures.append(0)
         
-        self.stats[operation_name]["attempts"] += 1
+        self._attempts[i] += 1
         if not success:
-            self.stats[operation_name]["failures"] += 1
+            self._failures[i] += 1
             
     def get_stats(self) -> Dict:
         """Returns retry statistics for all operations."""
+        if not self._index:
+            return {}
+        # Success rates for every operation in one vectorized pass over
+        # zero-copy views of the counter arrays
+        attempts = np.frombuffer(self._attempts, dtype=np.uint64).astype(np.float64)
+        failures = np.frombuffer(self._failures, dtype=np.uint64).astype(np.float64)
+        rates = np.divide(attempts - failures, attempts,
+                          out=np.zeros_like(attempts), where=attempts > 0)
+        rates = rates.tolist()
         return {
             name: {
-                "success_rate": (stats["attempts"] - stats["failures"]) / stats["attempts"]
-                    if stats["attempts"] > 0 else 0,
-                "total_attempts": stats["attempts"],
-                "total_failures": stats["failures"]
+                "success_rate": rates[i],
+                "total_attempts": self._attempts[i],
+                "total_failures": self._failures[i]
             }
-            for name, stats in self.stats.items()
+            for name, i in self._index.items()
         }
\ No newline at end of file
@@ -1,9 +1,13 @@
 # services/timing.py
 """Performance timing utilities for ETL operations."""
+import os
 import time
 from functools import wraps
 from typing import Optional, Callable
 
+# Read once at import: decorating is free when timing is switched off
+TIMING_DISABLED = os.getenv('ETL_NO_TIMING', '') not in ('', '0')
+
 def timing_metric(metric_name: str):
     """Decorator to track execution time of ETL operations.
     
@@ -14,11 +18,18 @@ def timing_metric(metric_name: str):
         Decorated function that logs timing data
     """
     def decorator(func: Callable):
+        if TIMING_DISABLED:
+            return func
+
+        # Bound once per decorated function: a closure cell read per call
+        # instead of a global plus attribute lookup
+        clock = time.perf_counter_ns
+
         @wraps(func)
         def wrapper(self, *args, **kwargs):
-            start = time.time()
+            start = clock()
             result = func(self, *args, **kwargs)
-            duration = time.time() - start
+            duration = (clock() - start) / 1e9
             self.monitoring.record_timing(metric_name, duration)
             return result
         return wrapper
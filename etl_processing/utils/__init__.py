@@ -1,4 +1,6 @@
 # etl_processing/utils/__init__.py
+from .config_loader import load_yaml_config
+from .json_writer import encode_json, write_json
 from .text_processor import TextProcessor
 
-__all__ = ["TextProcessor"]
\ No newline at end of file
+__all__ = ["TextProcessor", "encode_json", "load_yaml_config", "write_json"]
\ No newline at end of file
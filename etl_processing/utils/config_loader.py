@@ -0,0 +1,35 @@
+# utils/config_loader.py
+"""YAML configuration loading."""
+
+import copy
+import os
+from typing import Any, Dict, Tuple
+
+import yaml
+
+try:
+    # libyaml-backed loader, much faster than the pure-Python one
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+_CONFIG_CACHE: Dict[Tuple[str, float], Any] = {}
+
+
+def load_yaml_config(config_path: str) -> Any:
+    """Parse a YAML configuration file.
+
+    Each file version is parsed once per process; callers receive a deep
+    copy they are free to modify.
+
+    Args:
+        config_path: Path to YAML configuration
+
+    Returns:
+        Parsed configuration
+    """
+    cache_key = (os.path.abspath(config_path), os.path.getmtime(config_path))
+    if cache_key not in _CONFIG_CACHE:
+        with open(config_path, 'r') as f:
+            _CONFIG_CACHE[cache_key] = yaml.load(f, Loader=_Loader)
+    return copy.deepcopy(_CONFIG_CACHE[cache_key])
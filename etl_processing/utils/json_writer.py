@@ -0,0 +1,48 @@
+# utils/json_writer.py
+"""JSON encoding and report file writing."""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def encode_json(payload: Any, indent: bool = False) -> bytes:
+    """Encode a payload as UTF-8 JSON, using orjson when it is installed.
+
+    Values JSON cannot represent (datetimes, numpy scalars without orjson)
+    are written as str().
+
+    Args:
+        payload: Object to encode
+        indent: Pretty-print with two-space indentation
+
+    Returns:
+        Encoded document
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(payload, default=str, option=option)
+    if indent:
+        return json.dumps(payload, indent=2, default=str).encode('utf-8')
+    return json.dumps(payload, default=str, separators=(',', ':')).encode('utf-8')
+
+
+def write_json(path: str, payload: Any, indent: bool = True) -> None:
+    """Write a payload to a JSON file.
+
+    The document is encoded in memory and written with a single write().
+    json.dump always runs the pure-Python encoder and calls write() once
+    per encoder chunk; encode_json uses orjson or json.dumps instead.
+
+    Args:
+        path: File to create or overwrite
+        payload: Object to encode
+        indent: Pretty-print with two-space indentation
+    """
+    data = encode_json(payload, indent=indent)
+    with open(path, 'wb', buffering=1 << 20) as f:
+        f.write(data)
@@ -1,8 +1,11 @@
 # utils/text_processor.py
 """Text normalization utilities."""
 
-import re
-from typing import List, Optional
+from functools import lru_cache
+from typing import FrozenSet, List, Optional
+
+# Both delimiters are single characters: fold '/' into ',' and use str.split
+_SLASH_TO_COMMA = str.maketrans('/', ',')
 
 class TextProcessor:
     @staticmethod
@@ -18,8 +21,8 @@ class TextProcessor:
         if not localization_str:
             return []
         
-        values = re.split(r'[/,]', localization_str)
-        return [val.strip() for val in values if val.strip()]
+        values = localization_str.translate(_SLASH_TO_COMMA).split(',')
+        return [val for val in map(str.strip, values) if val]
 
     @staticmethod
     def normalize_text(text: str) -> str:
@@ -31,7 +34,8 @@ class TextProcessor:
         Returns:
             Normalized text
         """
-        return text.lower().strip()
+        # Strip first so padding is never copied into the lowered string
+        return text.strip().lower()
 
     @staticmethod
     def calculate_text_similarity(text1: str, text2: str, method='simple') -> float:
@@ -48,17 +52,51 @@ class TextProcessor:
         Raises:
             ValueError: If method not supported
         """
+        if method != 'simple':
+            raise ValueError(f"Unsupported similarity method: {method}")
+        
         t1 = TextProcessor.normalize_text(text1)
         t2 = TextProcessor.normalize_text(text2)
+        if t1 == t2:
+            # Identical labels: no tokenizing needed (stripped, so non-empty has a word)
+            return 1.0 if t1 else 0.0
+        
+        # Basic Jaccard similarity
+        return TextProcessor._jaccard(set(t1.split()), set(t2.split()))
+
+    @staticmethod
+    def batch_similarity(query: str, candidates: List[str], method='simple') -> List[float]:
+        """Calculates similarity between one query and many candidates.
+        
+        The query is tokenized once and candidate word sets are cached, so
+        repeated queries against the same candidates skip re-normalizing.
         
-        if method == 'simple':
-            # Basic Jaccard similarity
-            t1_words = set(t1.split())
-            t2_words = set(t2.split())
+        Args:
+            query: Text to compare
+            candidates: Texts to compare against
+            method: Similarity calculation method
             
-            intersection = len(t1_words.intersection(t2_words))
-            union = len(t1_words.union(t2_words))
+        Returns:
+            Similarity score (0-1) per candidate
             
-            return intersection / union if union > 0 else 0.0
+        Raises:
+            ValueError: If method not supported
+        """
+        if method != 'simple':
+            raise ValueError(f"Unsupported similarity method: {method}")
         
-        raise ValueError(f"Unsupported similarity method: {method}")
\ No newline at end of file
+        query_words = _word_set(query)
+        jaccard = TextProcessor._jaccard
+        return [jaccard(query_words, _word_set(candidate)) for candidate in candidates]
+
+    @staticmethod
+    def _jaccard(words1, words2) -> float:
+        # |A | B| = |A| + |B| - |A & B| avoids building the union set
+        intersection = len(words1 & words2)
+        union = len(words1) + len(words2) - intersection
+        return intersection / union if union > 0 else 0.0
+
+@lru_cache(maxsize=65536)
+def _word_set(text: str) -> FrozenSet[str]:
+    """Normalized word set of a text, cached across similarity batches."""
+    return frozenset(TextProcessor.normalize_text(text).split())
\ No newline at end of file
@@ -7,6 +7,7 @@ setup(
     install_requires=[
         "numpy>=2.2.0",
         "python-dotenv",
+        "mysqlclient",
         "mysql-connector-python",
         "sqlalchemy",
         "torch>=2.0.0",
@@ -14,6 +15,9 @@ setup(
         "pyyaml",
         "tqdm",
     ],
+    extras_require={
+        "async": ["sqlalchemy[asyncio]", "aiomysql"],
+    },
     include_package_data=True,
     package_data={
         "etl_processing": ["config/*.yml"],
@@ -25,5 +29,5 @@ setup(
     },
     author="Lars FORNELL",
     description="ETL processing with AI-assisted matching",
-    python_requires=">=3.8",
+    python_requires=">=3.10",
 )
\ No newline at end of file
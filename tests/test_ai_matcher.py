@@ -2,6 +2,10 @@
 """Unit tests for AI-based text matching service."""
 import pytest
 import logging
+import subprocess
+import sys
+import numpy as np
+from unittest.mock import patch
 from etl_processing.services.ai_matcher import AIMatcherService, MatchResult
 
 class TestAIMatcher:
@@ -75,4 +79,233 @@ class TestAIMatcher:
         matcher.find_best_match('Neige dure')
         
         # Check for specific log messages
-        assert any("Finding best match for" in record.message for record in caplog.records)
\ No newline at end of file
+        assert any("Finding best match for" in record.message for record in caplog.records)
+
+def _letter_counts(texts):
+    """Deterministic stand-in for sentence embeddings."""
+    def embed(text):
+        vector = np.zeros(26, dtype=np.float32)
+        for char in text.lower():
+            if 'a' <= char <= 'z':
+                vector[ord(char) - ord('a')] += 1
+        return vector
+    if isinstance(texts, str):
+        return embed(texts)
+    return np.array([embed(text) for text in texts])
+
+
+@pytest.fixture
+def fake_matcher():
+    with patch('etl_processing.services.ai_matcher.SentenceTransformer') as mock_model:
+        mock_model.return_value.encode.side_effect = lambda texts, **kwargs: _letter_counts(texts)
+        yield AIMatcherService(['Neige dure', 'Soleil', 'Brouillard'])
+
+
+class TestBatchMatching:
+    def test_find_best_matches_single_encode(self, fake_matcher):
+        """All query values are embedded in one encode call."""
+        fake_matcher.model.encode.reset_mock()
+        
+        results = fake_matcher.find_best_matches(['neige dure', 'soleil', 'xyz'])
+        
+        assert fake_matcher.model.encode.call_count == 1
+        assert [r.matched_value if r else None for r in results] == ['Neige dure', 'Soleil', None]
+
+    def test_context_values_share_query_encode(self, fake_matcher):
+        """Queries and their context values are embedded in one encode call."""
+        fake_matcher.model.encode.reset_mock()
+        contexts = [
+            {'Station': {'value': 'glacier', 'weight': 0.5}},
+            {'Station': {'value': 'sommet', 'weight': 0.5}}
+        ]
+        
+        fake_matcher.find_best_matches(['neige', 'soleil'], contexts)
+        
+        assert fake_matcher.model.encode.call_count == 1
+
+    def test_find_best_matches_same_as_single(self, fake_matcher):
+        """Batch results equal per-value results, including context weighting."""
+        values = ['neige', 'brouillard']
+        contexts = [
+            {'Station': {'value': 'soleil', 'weight': 0.5}},
+            {'Station': {'value': 'soleil', 'weight': 0.5}, 'Piste': 'rouge'}
+        ]
+        
+        batch = fake_matcher.find_best_matches(values, contexts, similarity_threshold=0.1)
+        single = [
+            fake_matcher.find_best_match(value, context, similarity_threshold=0.1)
+            for value, context in zip(values, contexts)
+        ]
+        
+        assert [r.id for r in batch] == [r.id for r in single]
+        assert [r.confidence for r in batch] == pytest.approx([r.confidence for r in single])
+
+    def test_find_best_matches_uninitialized(self):
+        with patch('etl_processing.services.ai_matcher.SentenceTransformer', side_effect=Exception("No model")):
+            matcher = AIMatcherService(['Neige dure'])
+        
+        assert matcher.find_best_matches(['a', 'b']) == [None, None]
+
+    def test_find_best_matches_returns_option_ids(self):
+        with patch('etl_processing.services.ai_matcher.SentenceTransformer') as mock_model:
+            mock_model.return_value.encode.side_effect = lambda texts, **kwargs: _letter_counts(texts)
+            matcher = AIMatcherService(['Neige dure', 'Soleil'], option_ids=[17, 42])
+        
+        match = matcher.find_best_match('soleil')
+        assert match.id == 42
+        assert match.matched_value == 'Soleil'
+
+    def test_float16_option_embeddings(self):
+        config = {'ai': {'embedding_dtype': 'float16'}}
+        with patch('etl_processing.services.ai_matcher.SentenceTransformer') as mock_model:
+            mock_model.return_value.encode.side_effect = lambda texts, **kwargs: _letter_counts(texts)
+            matcher = AIMatcherService(['Neige dure', 'Soleil'], config=config)
+        
+        assert matcher.option_embeddings.dtype == np.float16
+        assert matcher.option_embeddings.flags['C_CONTIGUOUS']
+        assert matcher.find_best_match('soleil').matched_value == 'Soleil'
+
+    def test_float16_cos_sim_in_chunks(self):
+        config = {'ai': {'embedding_dtype': 'float16'}}
+        options = ['Neige dure', 'Soleil', 'Brouillard']
+        with patch('etl_processing.services.ai_matcher.SentenceTransformer') as mock_model:
+            mock_model.return_value.encode.side_effect = lambda texts, **kwargs: _letter_counts(texts)
+            matcher = AIMatcherService(options, config=config)
+        query = _letter_counts(['neige', 'soleil'])
+        expected = matcher._normalize_rows(query) @ matcher.option_embeddings.astype(np.float32).T
+        
+        with patch('etl_processing.services.ai_matcher.OPTION_CHUNK_ROWS', 2):
+            scores = matcher._cos_sim(query)
+        
+        assert scores.dtype == np.float32
+        assert np.allclose(scores, expected)
+
+    def test_cos_sim_matches_cosine_similarity(self, fake_matcher):
+        raw_options = _letter_counts(fake_matcher.normalized_options)
+        query = _letter_counts('neige')
+        expected = raw_options @ query / (np.linalg.norm(raw_options, axis=1) * np.linalg.norm(query))
+        
+        assert fake_matcher.option_embeddings.flags['C_CONTIGUOUS']
+        assert fake_matcher.option_embeddings.dtype == np.float32
+        assert np.allclose(np.linalg.norm(fake_matcher.option_embeddings, axis=1), 1.0)
+        assert fake_matcher._cos_sim(query)[0] == pytest.approx(expected, abs=1e-6)
+
+    def test_encode_cached_reuses_embeddings(self, fake_matcher):
+        fake_matcher.model.encode.reset_mock()
+        
+        fake_matcher._encode_cached(['neige', 'soleil', 'neige'])
+        embeddings = fake_matcher._encode_cached(['soleil', 'brouillard'])
+        
+        assert fake_matcher.model.encode.call_count == 2
+        assert fake_matcher.model.encode.call_args[0][0] == ['brouillard']
+        assert np.array_equal(embeddings, _letter_counts(['soleil', 'brouillard']))
+
+    def test_encode_uses_configured_batching(self, fake_matcher):
+        fake_matcher.config = {'ai': {'batch_size': 128}}
+        fake_matcher.model.encode.reset_mock()
+        
+        fake_matcher._encode_cached(['neige'])
+        
+        kwargs = fake_matcher.model.encode.call_args[1]
+        assert kwargs['batch_size'] == 128
+        assert kwargs['normalize_embeddings'] is True
+        assert kwargs['show_progress_bar'] is False
+
+    def test_device_from_config(self):
+        with patch('etl_processing.services.ai_matcher.SentenceTransformer') as mock_model:
+            mock_model.return_value.encode.side_effect = lambda texts, **kwargs: _letter_counts(texts)
+            AIMatcherService(['Neige'], config={'ai': {'device': 'cpu'}})
+        
+        assert mock_model.call_args[1]['device'] == 'cpu'
+
+    def test_fp16_only_on_cuda(self):
+        with patch('etl_processing.services.ai_matcher.SentenceTransformer') as mock_model:
+            mock_model.return_value.encode.side_effect = lambda texts, **kwargs: _letter_counts(texts)
+            AIMatcherService(['Neige'], config={'ai': {'device': 'cpu', 'fp16': True}})
+            mock_model.return_value.half.assert_not_called()
+            
+            AIMatcherService(['Neige'], config={'ai': {'device': 'cuda', 'fp16': True}})
+            mock_model.return_value.half.assert_called_once()
+
+    def test_threads_from_config(self):
+        with patch('etl_processing.services.ai_matcher.SentenceTransformer') as mock_model, \
+                patch('torch.set_num_threads') as set_threads, \
+                patch('torch.set_num_interop_threads'):
+            mock_model.return_value.encode.side_effect = lambda texts, **kwargs: _letter_counts(texts)
+            AIMatcherService(['Neige'], config={'ai': {'threads': 4}})
+        
+        set_threads.assert_called_once_with(4)
+
+    def test_detect_device_falls_back_to_cpu(self):
+        with patch('torch.cuda.is_available', return_value=False), \
+                patch('torch.backends.mps.is_available', return_value=False):
+            assert AIMatcherService._detect_device() == 'cpu'
+
+    def test_medical_terms_appended_in_mapping_order(self, fake_matcher):
+        normalized = fake_matcher._normalize_medical_term('Rachis dorsal, Fémur')
+        
+        assert normalized.endswith(' jambe dos')
+        assert fake_matcher._normalize_medical_term('Neige') == 'neige'
+
+    def test_select_match_picks_highest(self, fake_matcher):
+        fake_matcher.existing_options = ['a', 'b', 'c', 'd', 'e']
+        fake_matcher.option_ids = [10, 20, 30, 40, 50]
+        
+        result = fake_matcher._select_match(np.array([0.1, 0.9, 0.3, 0.95, 0.2]), 0.5)
+        
+        assert result.id == 40
+        assert result.confidence == pytest.approx(0.95)
+        assert fake_matcher._select_match(np.array([0.4]), 0.5) is None
+
+    def test_option_embeddings_disk_cache(self, tmp_path):
+        config = {'ai': {'cache_dir': str(tmp_path)}}
+        with patch('etl_processing.services.ai_matcher.SentenceTransformer') as mock_model:
+            mock_model.return_value.encode.side_effect = lambda texts, **kwargs: _letter_counts(texts)
+            first = AIMatcherService(['Neige dure', 'Soleil'], config=config)
+            mock_model.return_value.encode.reset_mock()
+            second = AIMatcherService(['Neige dure', 'Soleil'], config=config)
+        
+        mock_model.return_value.encode.assert_not_called()
+        assert len(list(tmp_path.glob('embeddings_*.npy'))) == 1
+        assert np.array_equal(first.option_embeddings, second.option_embeddings)
+
+    def test_medical_term_ascii_folding(self, fake_matcher):
+        assert fake_matcher._normalize_medical_term('Épaule Gauche') == 'epaule gauche'
+        assert fake_matcher._normalize_medical_term('Œdème') == 'deme'
+
+    def test_find_best_matches_in_blocks(self, fake_matcher):
+        values = ['neige', 'soleil', 'brouillard', 'neige dure', 'xyz']
+        contexts = [{'Station': {'value': 'soleil', 'weight': 0.5}}] * len(values)
+        expected = fake_matcher.find_best_matches(values, contexts, similarity_threshold=0.1)
+        
+        fake_matcher.config = {'ai': {'match_block_size': 2}}
+        fake_matcher.model.encode.reset_mock()
+        results = fake_matcher.find_best_matches(values, contexts, similarity_threshold=0.1)
+        
+        assert results == expected
+        assert fake_matcher.model.encode.call_count == 0
+
+    def test_context_similarities_per_block(self, fake_matcher):
+        values = ['neige', 'soleil', 'brouillard', 'neige dure']
+        contexts = [{'Station': {'value': value, 'weight': 0.5}} for value in ['a', 'b', 'c', 'd']]
+        expected = fake_matcher.find_best_matches(values, contexts, similarity_threshold=0.1)
+        
+        fake_matcher.config = {'ai': {'match_block_size': 2}}
+        with patch.object(fake_matcher, '_cos_sim', wraps=fake_matcher._cos_sim) as cos_sim:
+            results = fake_matcher.find_best_matches(values, contexts, similarity_threshold=0.1)
+        
+        assert results == expected
+        assert max(len(call.args[0]) for call in cos_sim.call_args_list) == 2
+
+    def test_encode_cached_bounded(self, fake_matcher):
+        fake_matcher._embedding_cache_size = 2
+        
+        embeddings = fake_matcher._encode_cached(['a', 'b', 'c'])
+        
+        assert list(fake_matcher._embedding_cache) == ['b', 'c']
+        assert np.array_equal(embeddings, _letter_counts(['a', 'b', 'c']))
+
+def test_package_import_defers_torch():
+    """Importing the package must not load torch until a matcher is built."""
+    code = "import sys, etl_processing; sys.exit('torch' in sys.modules)"
+    assert subprocess.run([sys.executable, '-c', code]).returncode == 0
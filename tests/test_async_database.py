@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+from sqlalchemy.exc import SQLAlchemyError
+
+pytest.importorskip("sqlalchemy.ext.asyncio")
+
+from etl_processing.services.async_database import AsyncDatabaseManager
+
+@pytest.fixture
+def session():
+    session = AsyncMock()
+    session.execute.return_value = Mock(rowcount=1)
+    return session
+
+@pytest.fixture
+def db_manager(session):
+    session_factory = Mock()
+    session_factory.return_value.__aenter__ = AsyncMock(return_value=session)
+    session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+    with patch('etl_processing.services.async_database.create_async_engine'), \
+         patch('etl_processing.services.async_database.async_sessionmaker', return_value=session_factory), \
+         patch('etl_processing.services.async_database.load_dotenv'):
+        return AsyncDatabaseManager(logger=Mock(), pool_size=1, max_overflow=0)
+
+def test_session_scope_commits(db_manager, session):
+    async def run():
+        async with db_manager.session_scope() as scoped:
+            assert scoped is session
+
+    asyncio.run(run())
+    session.commit.assert_awaited_once()
+
+def test_session_scope_rolls_back(db_manager, session):
+    async def run():
+        async with db_manager.session_scope():
+            raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+    session.rollback.assert_awaited_once()
+
+def test_update_record_retry(db_manager, session):
+    session.execute.side_effect = [SQLAlchemyError("Deadlock"), None]
+
+    result = asyncio.run(db_manager.update_record(session, 1, "test_table", "test_field", "value"))
+
+    assert result is True
+    assert session.execute.await_count == 2
+    session.rollback.assert_awaited_once()
+
+def test_update_record_unexpected_error(db_manager, session):
+    session.execute.side_effect = ValueError("bad value")
+
+    result = asyncio.run(db_manager.update_record(session, 1, "test_table", "test_field", "value"))
+
+    assert result is False
+    assert session.execute.await_count == 1
+    session.rollback.assert_awaited_once()
+    db_manager.logger.error.assert_called_once()
+
+def test_connection_string_uses_utf8mb4(session):
+    with patch('etl_processing.services.async_database.create_async_engine') as engine, \
+         patch('etl_processing.services.async_database.async_sessionmaker'), \
+         patch('etl_processing.services.async_database.load_dotenv'):
+        AsyncDatabaseManager(logger=Mock())
+
+    assert engine.call_args[0][0].endswith('?charset=utf8mb4')
+
+def test_add_synonym_upsert(db_manager, session):
+    with patch('etl_processing.services.async_database.mysql_insert') as insert:
+        result = asyncio.run(db_manager.add_synonym(session, Mock(), " value ", "test_table", 1))
+
+    assert result is True
+    insert.return_value.values.return_value.on_duplicate_key_update.assert_called_once()
+    session.execute.assert_awaited_once()
+
+def test_session_scope_bounded_by_pool(db_manager):
+    """Sessions beyond pool_size + max_overflow wait for a free slot"""
+    active = []
+    peak = []
+
+    async def work():
+        async with db_manager.session_scope():
+            active.append(1)
+            peak.append(len(active))
+            await asyncio.sleep(0)
+            active.pop()
+
+    async def run():
+        await asyncio.gather(*(work() for _ in range(5)))
+
+    asyncio.run(run())
+    assert max(peak) == 1
@@ -0,0 +1,28 @@
+import os
+import pytest
+import yaml
+from etl_processing.utils.config_loader import load_yaml_config
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / 'config.yml'
+    path.write_text(yaml.dump({'settings': {'batch_size': 100}}))
+    return str(path)
+
+def test_load_yaml_config(config_file):
+    assert load_yaml_config(config_file) == {'settings': {'batch_size': 100}}
+
+def test_load_yaml_config_returns_copies(config_file):
+    config = load_yaml_config(config_file)
+    config['settings']['batch_size'] = 1
+    
+    assert load_yaml_config(config_file)['settings']['batch_size'] == 100
+
+def test_load_yaml_config_reloads_changed_file(config_file):
+    load_yaml_config(config_file)
+    with open(config_file, 'w') as f:
+        yaml.dump({'settings': {'batch_size': 200}}, f)
+    stat = os.stat(config_file)
+    os.utime(config_file, (stat.st_atime, stat.st_mtime + 10))
+    
+    assert load_yaml_config(config_file)['settings']['batch_size'] == 200
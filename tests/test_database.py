@@ -1,7 +1,15 @@
 import pytest
 from unittest.mock import Mock, patch, MagicMock
+from sqlalchemy.dialects import mysql
 from sqlalchemy.exc import SQLAlchemyError
-from etl_processing.services.database import DatabaseManager
+from etl_processing.services.database import DatabaseManager, get_engine, update_statement
+from etl_processing.lib.model_factory import ModelFactory
+
+@pytest.fixture(autouse=True)
+def clear_engine_cache():
+    get_engine.cache_clear()
+    yield
+    get_engine.cache_clear()
 
 @pytest.fixture
 def mock_logger():
@@ -15,6 +23,7 @@ def mock_session_factory():
     session.close = Mock()
     session.query = Mock()
     session.execute = Mock()
+    session._is_asyncio = False
     return lambda: session
 
 @pytest.fixture
@@ -31,6 +40,28 @@ def db_manager(mock_logger, mock_session_factory):
         mock_sessionmaker.return_value = mock_session_factory
         return DatabaseManager(logger=mock_logger)
 
+def test_default_driver_is_mysqlclient(mock_logger):
+    with patch('etl_processing.services.database.create_engine') as mock_engine, \
+         patch('etl_processing.services.database.sessionmaker'), \
+         patch('etl_processing.services.database.load_dotenv'), \
+         patch.dict('os.environ', {'MYSQL_HOST': 'db'}, clear=True):
+        DatabaseManager(logger=mock_logger)
+    
+    url = mock_engine.call_args[0][0]
+    assert url.startswith('mysql+mysqldb://')
+    assert url.endswith('?charset=utf8mb4')
+    assert mock_engine.call_args[1]['query_cache_size'] == 1200
+
+def test_engine_shared_between_managers(mock_logger):
+    with patch('etl_processing.services.database.create_engine') as mock_engine, \
+         patch('etl_processing.services.database.sessionmaker'), \
+         patch('etl_processing.services.database.load_dotenv'):
+        first = DatabaseManager(logger=mock_logger)
+        second = DatabaseManager(logger=mock_logger)
+    
+    assert mock_engine.call_count == 1
+    assert first.engine is second.engine
+
 def test_session_scope_success(db_manager):
     with db_manager.session_scope() as session:
         session.query("test")
@@ -44,6 +75,15 @@ def test_session_scope_error(db_manager):
     assert session.rollback.call_count == 1
     assert session.close.call_count == 1
 
+def test_nested_session_scope_joins_outer(db_manager):
+    with db_manager.session_scope() as outer:
+        with db_manager.session_scope() as inner:
+            assert inner is outer
+        assert outer.commit.call_count == 0
+        assert outer.close.call_count == 0
+    assert outer.commit.call_count == 1
+    assert outer.close.call_count == 1
+
 def test_update_record_failure(db_manager):
     with db_manager.session_scope() as session:
         session.execute.side_effect = SQLAlchemyError()
@@ -61,6 +101,50 @@ def test_update_record_failure(db_manager):
         assert session.execute.call_count == 1
         assert session.rollback.call_count == 1
 
+def test_update_record_in_caller_transaction(db_manager):
+    """Test updates can share one transaction instead of committing per row"""
+    with db_manager.session_scope() as session:
+        session.execute.side_effect = [SQLAlchemyError("Deadlock"), None]
+        
+        result = db_manager.update_record(
+            session=session,
+            record_id=1,
+            table_name="test_table",
+            field="test_field",
+            value="test_value",
+            commit=False
+        )
+        
+        assert result is True
+        assert session.begin_nested.call_count == 2
+        session.commit.assert_not_called()
+        session.rollback.assert_not_called()
+
+def test_update_records_bulk(db_manager):
+    with db_manager.session_scope() as session:
+        updates = [(record_id, record_id * 10) for record_id in range(1, 6)]
+        
+        result = db_manager.update_records_bulk(session, "test_table", "test_field", updates, batch_size=2)
+        
+        assert result == 5
+        assert session.execute.call_count == 3
+        assert session.execute.call_args_list[0][0][1] == [{'value': 10, 'id': 1}, {'value': 20, 'id': 2}]
+
+def test_update_records_bulk_retries_batch(db_manager):
+    with db_manager.session_scope() as session:
+        session.execute.side_effect = [SQLAlchemyError("Deadlock"), None]
+        
+        result = db_manager.update_records_bulk(session, "test_table", "test_field", [(1, 'a'), (2, 'b')])
+        
+        assert result == 2
+        assert session.execute.call_count == 2
+        assert session.rollback.call_count == 1
+
+def test_update_statement_cached():
+    assert update_statement("test_table", "test_field") is update_statement("test_table", "test_field")
+    with pytest.raises(ValueError):
+        update_statement("test_table; DROP TABLE x", "test_field")
+
 def test_query_table_with_filters(db_manager):
     with db_manager.session_scope() as session:
         model = Mock()
@@ -129,13 +213,22 @@ def test_update_record_all_retries_fail(db_manager):
         assert session.rollback.call_count == 3
         assert db_manager.logger.error.call_count == 1
 
-def test_add_synonym_success(db_manager):
+@pytest.fixture
+def synonym_model():
+    return ModelFactory.create_model('dicosynonymes', {
+        'name': 'dicosynonymes',
+        'columns': {
+            'id': {'type': 'int unsigned', 'primary': True},
+            'table_name': {'type': 'varchar(255)'},
+            'table_name_id': {'type': 'int unsigned'},
+            'name': {'type': 'varchar(255)'},
+            'ai_match_message': {'type': 'text'}
+        }
+    })
+
+def test_add_synonym_success(db_manager, synonym_model):
     """Test successful synonym addition"""
     with db_manager.session_scope() as session:
-        # Mock the synonym model
-        synonym_model = Mock()
-        session.query.return_value.filter.return_value.first.return_value = None
-        
         result = db_manager.add_synonym(
             session=session,
             synonym_model=synonym_model,
@@ -146,14 +239,13 @@ def test_add_synonym_success(db_manager):
         )
         
         assert result is True
-        assert session.add.call_count == 1
-        assert session.flush.call_count == 1
+        assert session.execute.call_count == 1
+        session.query.assert_not_called()
 
-def test_add_synonym_existing(db_manager):
-    """Test adding an existing synonym"""
+def test_add_synonym_error(db_manager, synonym_model):
+    """Test error handling in synonym addition"""
     with db_manager.session_scope() as session:
-        synonym_model = Mock()
-        session.query.return_value.filter.return_value.first.return_value = Mock()
+        session.execute.side_effect = SQLAlchemyError("Database error")
         
         result = db_manager.add_synonym(
             session=session,
@@ -164,23 +256,16 @@ def test_add_synonym_existing(db_manager):
         )
         
         assert result is False
-        assert session.add.call_count == 0
-        assert db_manager.logger.info.call_count >= 1
+        assert session.rollback.call_count == 1
+        assert db_manager.logger.error.call_count == 1
 
-def test_add_synonym_error(db_manager):
-    """Test error handling in synonym addition"""
+def test_add_synonym_upsert(db_manager, synonym_model):
+    """Test the trimmed name is upserted so an existing synonym keeps its mapping"""
     with db_manager.session_scope() as session:
-        synonym_model = Mock()
-        session.query.side_effect = SQLAlchemyError("Database error")
-        
-        result = db_manager.add_synonym(
-            session=session,
-            synonym_model=synonym_model,
-            value="test_value",
-            target_table="test_table",
-            target_id=1
-        )
+        db_manager.add_synonym(session, synonym_model, " value ", "test_table", 1)
         
-        assert result is False
-        assert session.rollback.call_count == 1
-        assert db_manager.logger.error.call_count == 1
\ No newline at end of file
+        stmt = session.execute.call_args[0][0]
+        sql = str(stmt.compile(dialect=mysql.dialect()))
+        assert sql.startswith("INSERT INTO dicosynonymes")
+        assert sql.endswith("ON DUPLICATE KEY UPDATE table_name_id = dicosynonymes.table_name_id")
+        assert stmt.compile().params['name'] == "value"
@@ -30,17 +30,14 @@ def test_handle_validation_error(error_handler):
     assert len(error_handler.error_history) == 1
     assert error_handler.error_counts["validation"] == 1
 
-def test_handle_mapping_error(error_handler):
-    error = MappingError("Mapping failed", "mapping")
-    result = error_handler.handle_error(error)
-    assert result is True
-    error_handler.logger.warning.assert_called_once()
-
-def test_handle_database_error(error_handler):
-    error = DatabaseError("DB error", "database")
-    result = error_handler.handle_error(error)
-    assert result is False
-    error_handler.logger.error.assert_called_once()
+@pytest.mark.parametrize("error, expected, log_method, error_type", [
+    (MappingError("Mapping failed", "mapping"), True, "warning", "mapping"),
+    (DatabaseError("DB error", "database"), False, "error", "database"),
+], ids=["mapping", "database"])
+def test_handle_typed_error(error_handler, error, expected, log_method, error_type):
+    assert error_handler.handle_error(error) is expected
+    getattr(error_handler.logger, log_method).assert_called_once()
+    error_handler.monitoring_service.record_error.assert_called_once_with(error_type, str(error))
 
 def test_error_handler_decorator(mock_monitoring):
     @with_error_handling("test_operation", mock_monitoring)
@@ -58,24 +55,48 @@ def test_error_handler_decorator(mock_monitoring):
         test_function(False)
     mock_monitoring.record_error.assert_called_once()
 
+def test_error_handler_decorator_wraps_unexpected(mock_monitoring):
+    @with_error_handling("test_operation", mock_monitoring)
+    def test_function():
+        raise KeyError("missing")
+    
+    with pytest.raises(ETLError) as excinfo:
+        test_function()
+    assert excinfo.value.details['original_error'] == "'missing'"
+    assert 'raise KeyError("missing")' in ''.join(excinfo.value.details['traceback'].format())
+    assert isinstance(excinfo.value.__cause__, KeyError)
+
 @pytest.mark.integration
 def test_error_handler_save_report(error_handler, tmp_path):
     error_handler.handle_error(ValidationError("Test error", "validation"))
     error_handler.handle_error(MappingError("Another error", "mapping"))
     
-    with patch('builtins.open', create=True) as mock_file, \
-         patch('json.dump') as mock_json_dump:
+    with patch('etl_processing.services.error_handler.write_json') as mock_write_json:
         error_handler.save_error_report()
-        mock_file.assert_called_once()
-        mock_json_dump.assert_called_once()
+        mock_write_json.assert_called_once()
         
-        # Verify the structure of data passed to json.dump
-        args, kwargs = mock_json_dump.call_args
-        assert 'error_counts' in args[0]
-        assert 'errors' in args[0]
-        assert len(args[0]['errors']) == 2
-        assert args[0]['error_counts']['validation'] == 1
-        assert args[0]['error_counts']['mapping'] == 1
+        # Verify the structure of data passed to write_json
+        args, kwargs = mock_write_json.call_args
+        assert args[0].startswith('reports/errors/errors_')
+        assert 'error_counts' in args[1]
+        assert 'errors' in args[1]
+        assert len(args[1]['errors']) == 2
+        assert args[1]['error_counts']['validation'] == 1
+        assert args[1]['error_counts']['mapping'] == 1
+
+def test_error_handler_save_report_large(error_handler, tmp_path, monkeypatch):
+    """Test a full-history report is written and parses back"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "reports" / "errors").mkdir(parents=True)
+    for i in range(10_000):
+        error_handler.handle_error(ValidationError(f"Error {i}", "validation"))
+    
+    error_handler.save_error_report()
+    
+    report_file, = (tmp_path / "reports" / "errors").iterdir()
+    report = json.loads(report_file.read_text())
+    assert len(report['errors']) == 10_000
+    assert report['error_counts']['validation'] == 10_000
 
 def test_handle_unknown_error(error_handler):
     """Test handling of unknown error types"""
@@ -96,4 +117,42 @@ def test_get_error_summary(error_handler):
     summary = error_handler.get_error_summary()
     assert summary['total_errors'] == 3
     assert summary['error_counts']['validation'] == 2
-    assert summary['error_counts']['mapping'] == 1
\ No newline at end of file
+    assert summary['error_counts']['mapping'] == 1
+
+def test_error_stream_and_bounded_history(mock_logger, tmp_path):
+    """Test errors are streamed as JSON lines while memory keeps the latest"""
+    stream_path = tmp_path / "errors.ndjson"
+    error_handler = ErrorHandler(mock_logger, stream_path=str(stream_path), max_history=2)
+    for i in range(3):
+        error_handler.handle_error(ValidationError(f"Error {i}", "validation"))
+    with patch('etl_processing.services.error_handler.write_json') as mock_write_json:
+        error_handler.save_error_report()
+        mock_write_json.assert_not_called()
+    
+    lines = stream_path.read_text().splitlines()
+    assert [json.loads(line)['message'] for line in lines] == ["Error 0", "Error 1", "Error 2"]
+    assert len(error_handler.error_history) == 2
+    assert error_handler.get_error_summary()['total_errors'] == 3
+
+def test_classify_error_subclass(error_handler):
+    """Test subclasses of known errors keep their classification"""
+    class SchemaError(ValidationError):
+        pass
+    
+    assert error_handler._classify_error(SchemaError("Bad schema", "validation")) == 'validation'
+    assert error_handler._classify_error(ETLError("Generic", "etl")) == 'unknown'
+
+def test_traceback_formatted_on_report(error_handler):
+    """Test tracebacks are kept as exceptions and formatted when reported"""
+    try:
+        raise MappingError("Late failure", "mapping")
+    except MappingError as e:
+        error_handler.handle_error(e)
+    
+    entry = error_handler.error_history[0]
+    assert 'traceback' not in entry
+    assert entry['error'].stack[0].locals is None
+    report = error_handler._report_entry(entry)
+    assert 'raise MappingError("Late failure", "mapping")' in report['traceback']
+    assert 'error' not in report
+    assert isinstance(report['timestamp'], datetime)
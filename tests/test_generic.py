@@ -1,11 +1,22 @@
+import re
 import pytest
+from contextlib import nullcontext
+import yaml
+from types import SimpleNamespace
 from unittest.mock import Mock, patch, MagicMock
+from etl_processing.etl import generic
 from etl_processing.etl.generic import GenericETL
 from etl_processing.services.ai_matcher import MatchResult
 
-@pytest.fixture
-def sample_config(tmp_path):
-    import yaml
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
+@pytest.fixture(scope="session")
+def sample_config(tmp_path_factory):
+    # Written once; load_yaml_config hands each GenericETL its own deep copy,
+    # so tests mutating etl_config cannot leak into each other
     config = {
         'database': {
             'tables': {
@@ -81,9 +92,9 @@ def sample_config(tmp_path):
         }
     }
     
-    config_file = tmp_path / "test_config.yml"
+    config_file = tmp_path_factory.mktemp("cfg") / "test_config.yml"
     with open(config_file, 'w') as f:
-        yaml.dump(config, f)
+        yaml.dump(config, f, Dumper=SafeDumper)
     return str(config_file)
 
 @pytest.fixture
@@ -98,6 +109,7 @@ def mock_models():
     target_model.name = Mock()
     
     junction_model = Mock(name='JunctionModel')
+    junction_model.__table__ = Mock()
     junction_model.source_id = Mock()
     junction_model.target_id = Mock()
     
@@ -114,131 +126,120 @@ def mock_models():
     }
 
 @pytest.fixture
-def etl(sample_config, mock_models):
-    with patch('etl_processing.etl.generic.DatabaseManager') as mock_db, \
-         patch('etl_processing.etl.generic.AIMatcherService') as mock_ai, \
-         patch('etl_processing.etl.generic.ModelFactory.load_models', return_value=mock_models):
+def mock_insert():
+    with patch.object(generic, 'mysql_insert') as mock_insert:
+        yield mock_insert
+
+def _build_etl(etl_type, sample_config, mock_models):
+    # GenericETL only reaches these collaborators from __init__, so the
+    # patches can end as soon as the instance exists
+    with patch.object(generic, 'DatabaseManager') as mock_db, \
+         patch.object(generic, 'AIMatcherService'), \
+         patch.object(generic.ModelFactory, 'load_models', return_value=mock_models):
         
-        # Configure mock session
-        session = MagicMock()
-        mock_db.return_value.session_scope.return_value.__enter__.return_value = session
-        mock_db.return_value.session_scope.return_value.__exit__.return_value = None
+        # A plain reusable context manager instead of an auto-built
+        # __enter__/__exit__ MagicMock chain
+        mock_db.return_value.session_scope.return_value = nullcontext(MagicMock())
         
-        return GenericETL('test', sample_config)
+        return GenericETL(etl_type, sample_config)
+
+@pytest.fixture
+def etl(sample_config, mock_models):
+    return _build_etl('test', sample_config, mock_models)
 
 @pytest.fixture
 def etl_multi(sample_config, mock_models):
-    with patch('etl_processing.etl.generic.DatabaseManager') as mock_db, \
-         patch('etl_processing.etl.generic.AIMatcherService') as mock_ai, \
-         patch('etl_processing.etl.generic.ModelFactory.load_models', return_value=mock_models):
-        
-        # Configure mock session
-        session = MagicMock()
-        mock_db.return_value.session_scope.return_value.__enter__.return_value = session
-        mock_db.return_value.session_scope.return_value.__exit__.return_value = None
-        
-        return GenericETL('test_multi', sample_config)
+    return _build_etl('test_multi', sample_config, mock_models)
 
-def test_process_record_with_direct_match(etl):
-    with etl.db_manager.session_scope() as session:
-        record = MagicMock()
-        record.id = 1
-        record.value_field = "test_value"
-        
-        # Setup direct match
-        direct_match = Mock()
-        direct_match.id = 2
-        session.query.return_value.filter.return_value.first.return_value = direct_match
-        
-        result = etl._process_record(session, record)
-        assert result is True
+def _setup_direct_match(etl, session):
+    etl.name_to_id = {"test_value": 2}
+
+def _setup_ai_match(etl, session):
+    # Empty name maps leave no direct match
+    etl.ai_matcher.find_best_match.return_value = MatchResult(id=3, confidence=0.95, matched_value="matched")
+
+def _setup_nothing(etl, session):
+    pass
 
-def test_process_record_with_ai_match(etl):
+@pytest.mark.parametrize("value, setup, expected", [
+    ("test_value", _setup_direct_match, True),
+    ("test_value", _setup_ai_match, True),
+    ("123", _setup_nothing, False),  # Should be skipped by validation
+], ids=["direct", "ai", "validation"])
+def test_process_record(etl, mock_insert, value, setup, expected):
     with etl.db_manager.session_scope() as session:
-        record = MagicMock()
-        record.id = 1
-        record.value_field = "test_value"
+        record = SimpleNamespace(id=1, value_field=value)
+        setup(etl, session)
         
-        # No direct match
-        session.query.return_value.filter.return_value.first.return_value = None
-        
-        # Setup AI match
-        match_result = MatchResult(id=0, confidence=0.95, matched_value="matched")
-        etl.ai_matcher.find_best_match.return_value = match_result
-        etl.id_map = {0: 3}
-        
-        result = etl._process_record(session, record)
-        assert result is True
+        assert etl._process_record(session, record) is expected
 
 def test_process_record_multi_value(etl_multi):
     with etl_multi.db_manager.session_scope() as session:
-        record = MagicMock()
-        record.id = 1
-        record.value_field = "value1/value2"
+        record = SimpleNamespace(id=1, value_field="value1/value2")
         
         # Setup matches
-        match1 = Mock(id=2)
-        match2 = Mock(id=3)
-        session.query.return_value.filter.return_value.first.side_effect = [match1, match2]
+        etl_multi.name_to_id = {"value1": 2, "value2": 3}
         
+        queries_before = session.query.call_count
         result = etl_multi._process_record(session, record)
         assert result is True
-        assert session.add.call_count == 2
-
-def test_process_record_with_validation(etl):
-    with etl.db_manager.session_scope() as session:
-        record = MagicMock()
-        record.id = 1
-        record.value_field = "123"  # Should be skipped by validation
-        
-        result = etl._process_record(session, record)
-        assert result is False
+        # Direct matches resolve from the preloaded name maps: no lookup queries
+        assert session.query.call_count == queries_before
+        session.execute.assert_called_once()
+        rows = session.execute.call_args[0][1]
+        assert rows == [
+            {'source_id': 1, 'target_id': 2},
+            {'source_id': 1, 'target_id': 3}
+        ]
 
 def test_get_context(etl):
-    record = MagicMock()
-    record.context_field = "test_context"
+    record = SimpleNamespace(context_field="test_context")
     
     context = etl._get_context(record)
     assert context["context_field"]["value"] == "test_context"
     assert context["context_field"]["weight"] == 0.5
 
 def test_find_direct_match_no_match(etl):
-    with etl.db_manager.session_scope() as session:
-        session.query.return_value.filter.return_value.first.return_value = None
-        
-        result = etl._find_direct_match(session, "test_value")
-        assert result is None
+    result = etl._find_direct_match("test_value")
+    assert result is None
 
 def test_find_direct_match_in_dictionary(etl):
-    with etl.db_manager.session_scope() as session:
-        # No direct match in target table
-        session.query.return_value.filter.return_value.first.side_effect = [
-            None,  # No match in target table
-            Mock(table_name_id=2)  # Match in dictionary
-        ]
-        
-        result = etl._find_direct_match(session, "test_value")
-        assert result == 2
+    # No direct match in target table, match in dictionary
+    etl.synonym_to_id = {"test_value": 2}
+    
+    result = etl._find_direct_match("Test_Value ")
+    assert result == 2
+
+def test_find_direct_match_ignores_accents(etl):
+    # Mirrors the accent-insensitive utf8mb4_general_ci collation
+    etl.norm_name_to_id = {"epaule": 4}
+    etl.synonym_to_id = {"cote gauche": 5}
+    
+    assert etl._find_direct_match(" Épaule") == 4
+    assert etl._find_direct_match("Côté Gauche") == 5
 
 def test_run_with_progress(etl):
     """Replace only the monitoring assertions in this test"""
     with etl.db_manager.session_scope() as session:
         # Setup records
-        record = MagicMock()
-        record.id = 1
-        record.value_field = "test_value"
+        record = SimpleNamespace(id=1, value_field="test_value")
         
         # Configure session behavior
-        session.query.return_value.filter.return_value.limit.return_value.all.return_value = [record]
-        session.query.return_value.filter.return_value.first.return_value = Mock(id=2)
+        session.query.return_value.options.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = [record]
+        etl.name_to_id = {"test_value": 2}
         
         # Mock monitoring properly
         etl.monitoring.start_run = Mock()
         etl.monitoring.end_run = Mock()
+        etl.monitoring.record_success = Mock()
         
-        etl.run()
+        with patch.object(generic, 'load_only'):
+            etl.run()
         assert etl.monitoring.start_run.call_count == 1
         assert etl.monitoring.end_run.call_count == 1
+        assert etl.monitoring.record_success.call_count == 1
+        session.merge.assert_not_called()
+        session.begin_nested.assert_called()
    
 def test_run_with_error(etl):
     """Replace only the monitoring assertions in this test"""
@@ -256,22 +257,191 @@ def test_run_with_error(etl):
         assert etl.monitoring.end_run.call_count == 1
         assert etl.logger.error.call_count > 0
 
-def test_process_record_add_synonym(etl):
+def test_process_record_add_synonym(etl, mock_insert):
     with etl.db_manager.session_scope() as session:
-        record = MagicMock()
-        record.id = 1
-        record.value_field = "test_value"
+        record = SimpleNamespace(id=1, value_field="test_value")
         
         # No direct match, but AI match
-        session.query.return_value.filter.return_value.first.return_value = None
-        match_result = MatchResult(id=0, confidence=0.95, matched_value="matched")
+        match_result = MatchResult(id=3, confidence=0.95, matched_value="matched")
         etl.ai_matcher.find_best_match.return_value = match_result
-        etl.id_map = {0: 3}
-        
-        # Add synonym
-        new_synonym = Mock()
-        session.add.return_value = new_synonym
         
         result = etl._process_record(session, record)
         assert result is True
-        session.add.assert_called()
\ No newline at end of file
+        mock_insert.assert_called_once_with(etl.models['dictionary'])
+        mock_insert.return_value.values.assert_called_once_with(
+            table_name='target',
+            table_name_id=3,
+            name='test_value',
+            ai_match_message='AI match with confidence 0.9500'
+        )
+        upsert = mock_insert.return_value.values.return_value.on_duplicate_key_update.return_value
+        session.execute.assert_any_call(upsert)
+        assert etl.synonym_to_id["test_value"] == 3
+
+def test_find_direct_matches_bulk(etl):
+    etl.name_to_id = {"Value1": 2}
+    etl.norm_name_to_id = {"value1": 2}  # Case differs from input
+    etl.synonym_to_id = {"value2": 3}
+    
+    result = etl._find_direct_matches(["value1", "value2", "value3"])
+    assert result == {"value1": 2, "value2": 3}
+
+def test_add_synonym_returns_lookup_key(etl, mock_insert):
+    with etl.db_manager.session_scope() as session:
+        session.reset_mock()
+        
+        assert etl._add_synonym(session, " New Value ", 5, 0.9) == "new value"
+        # Published by _process_record once the savepoint is released
+        assert etl._find_direct_match("new value") is None
+        assert session.execute.call_count == 1
+        session.query.assert_not_called()
+
+def test_process_record_savepoint_rollback_keeps_lookup(etl, mock_insert):
+    with etl.db_manager.session_scope() as session:
+        record = SimpleNamespace(id=1, value_field="test_value")
+        etl.ai_matcher.find_best_match.return_value = MatchResult(id=3, confidence=0.95, matched_value="matched")
+        session.flush.side_effect = Exception("Flush failed")
+        
+        assert etl._process_record(session, record) is False
+        assert "test_value" not in etl.synonym_to_id
+
+def test_add_synonym_existing(etl, mock_insert):
+    with etl.db_manager.session_scope() as session:
+        etl.synonym_to_id = {"known value": 4}
+        
+        etl._add_synonym(session, "Known Value", 5, 0.9)
+        mock_insert.assert_not_called()
+        assert etl.synonym_to_id["known value"] == 4
+
+def test_split_values_uses_compiled_separator(etl, etl_multi):
+    assert etl._split_re is None
+    assert etl._split_values("a/b") == ["a/b"]
+    assert etl_multi._split_values(" a / b,, c ") == ["a", "b", "c"]
+
+def test_is_valid_value_uses_compiled_pattern(etl, etl_multi):
+    assert etl._skip_re.pattern == '^\\d+$'
+    assert etl.is_valid_value(" 42 ") is False
+    assert etl.is_valid_value("value") is True
+    assert etl_multi._skip_re is None
+    assert etl_multi.is_valid_value("42") is True
+
+def test_get_unmapped_records_keyset(etl):
+    with etl.db_manager.session_scope() as session:
+        etl.source_model.id = MagicMock()
+        etl.source_model.id.__gt__.return_value = Mock(name='id_condition')
+        
+        with patch.object(generic, 'load_only'):
+            etl.get_unmapped_records(session, 10, last_id=5)
+        etl.source_model.id.__gt__.assert_called_once_with(5)
+        query = session.query.return_value.options.return_value.filter.return_value
+        query.order_by.assert_called_once_with(etl.source_model.id)
+        query.order_by.return_value.limit.assert_called_once_with(10)
+
+def test_compile_skip_pattern_falls_back_to_re(etl):
+    re2 = Mock()
+    re2.compile.side_effect = Exception("Unsupported syntax")
+    
+    with patch.object(generic, 're2', re2):
+        compiled = etl._compile_skip_pattern('^(a)\\1$')
+    assert isinstance(compiled, re.Pattern)
+    assert compiled.match("aa")
+
+def test_find_ai_match_cached(etl):
+    etl.ai_matcher.find_best_match.return_value = None
+    context = {'context_field': {'value': 'ctx', 'weight': 0.5}}
+    
+    assert etl._find_ai_match("Value", context) is None
+    assert etl._find_ai_match(" value ", context) is None
+    assert etl.ai_matcher.find_best_match.call_count == 1
+    
+    etl._find_ai_match("value", {'context_field': {'value': 'other', 'weight': 0.5}})
+    assert etl.ai_matcher.find_best_match.call_count == 2
+
+def test_find_ai_match_cache_bounded(etl):
+    etl.settings['match_cache_size'] = 2
+    etl.ai_matcher.find_best_match.return_value = None
+    
+    for value in ["a", "b", "c"]:
+        etl._find_ai_match(value, {})
+    assert len(etl._match_cache) == 2
+    assert ("a", ()) not in etl._match_cache
+
+def test_prefetch_ai_matches(etl_multi):
+    etl_multi.name_to_id = {"known": 2}
+    records = [
+        SimpleNamespace(id=1, value_field="known/unknown1"),
+        SimpleNamespace(id=2, value_field="unknown1/unknown2"),
+        SimpleNamespace(id=3, value_field=None)
+    ]
+    match_result = MatchResult(id=0, confidence=0.95, matched_value="matched")
+    etl_multi.ai_matcher.find_best_matches.return_value = [match_result, None]
+    
+    etl_multi._prefetch_ai_matches(records)
+    
+    etl_multi.ai_matcher.find_best_matches.assert_called_once_with(
+        ["unknown1", "unknown2"], [{}, {}]
+    )
+    assert etl_multi._find_ai_match("unknown1", {}) == match_result
+    assert etl_multi._find_ai_match("unknown2", {}) is None
+    etl_multi.ai_matcher.find_best_match.assert_not_called()
+
+def test_run_commits_per_interval(etl):
+    with etl.db_manager.session_scope() as session:
+        records = [SimpleNamespace(id=i, value_field="test_value") for i in range(1, 6)]
+        session.query.return_value.options.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = records
+        etl.name_to_id = {"test_value": 2}
+        etl.settings['commit_interval'] = 2
+        session.reset_mock()
+        
+        with patch.object(generic, 'load_only'):
+            etl.run()
+        # Two full groups, then the remaining record
+        assert session.commit.call_count == 3
+        assert session.begin_nested.call_count == 5
+
+def test_run_failed_commit_rolls_back_group(etl, mock_insert):
+    with etl.db_manager.session_scope() as session:
+        records = [SimpleNamespace(id=i, value_field=f"value{i}") for i in range(1, 5)]
+        session.query.return_value.options.return_value.filter.return_value.order_by.return_value.limit.return_value.all.return_value = records
+        etl.ai_matcher.find_best_matches.return_value = [
+            MatchResult(id=3, confidence=0.95, matched_value="matched")
+        ] * len(records)
+        etl.settings['commit_interval'] = 2
+        session.reset_mock()
+        session.commit.side_effect = [Exception("Deadlock"), None]
+        etl.logger = Mock()
+        
+        with patch.object(generic, 'load_only'):
+            etl.run()
+        
+        assert session.commit.call_count == 2
+        session.rollback.assert_called_once()
+        assert "rolled back 2 records [1, 2]" in etl.logger.error.call_args_list[0][0][0]
+        # Synonyms of the lost group are forgotten; the committed ones stay
+        assert set(etl.synonym_to_id) == {"value3", "value4"}
+        etl.logger.info.assert_any_call("ETL process completed. Total records processed: 2")
+
+def test_init_ai_matcher_streams_options(sample_config, mock_models):
+    with patch.object(generic, 'DatabaseManager') as mock_db, \
+         patch.object(generic, 'AIMatcherService') as mock_ai, \
+         patch.object(generic.ModelFactory, 'load_models', return_value=mock_models):
+        session = MagicMock()
+        mock_db.return_value.session_scope.return_value.__enter__.return_value = session
+        session.query.return_value.yield_per.return_value = [(7, "Neige dure"), (9, " Soleil ")]
+        session.query.return_value.filter.return_value.yield_per.return_value = [("Neige", 7)]
+        
+        etl = GenericETL('test', sample_config)
+        
+        mock_ai.assert_called_once_with(
+            existing_options=["Neige dure", " Soleil "],
+            logger=etl.logger,
+            config=etl.config,
+            option_ids=[7, 9]
+        )
+        assert etl._find_direct_match("Neige dure") == 7
+        assert etl._find_direct_match("soleil") == 9
+        assert etl._find_direct_match("NEIGE") == 7
+
+def test_split_values_keeps_inner_whitespace(etl_multi):
+    assert etl_multi._split_values("  genou droit /\tcheville ,  ") == ["genou droit", "cheville"]
+    assert etl_multi._split_values(" / , ") == []
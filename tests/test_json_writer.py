@@ -0,0 +1,24 @@
+import json
+import numpy as np
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+from etl_processing.utils.json_writer import encode_json, write_json
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_encode_json(use_orjson):
+    payload = {'avg': np.float64(1.5), 'when': datetime(2024, 1, 1)}
+    if use_orjson:
+        pytest.importorskip("orjson")
+        encoded = encode_json(payload, indent=True)
+    else:
+        with patch('etl_processing.utils.json_writer.orjson', None):
+            encoded = encode_json(payload, indent=True)
+    decoded = json.loads(encoded)
+    assert decoded['avg'] == 1.5
+    assert decoded['when'].startswith('2024-01-01')
+
+def test_write_json(tmp_path):
+    path = tmp_path / 'report.json'
+    write_json(str(path), {'errors': ['é'] * 3})
+    assert json.loads(path.read_bytes()) == {'errors': ['é'] * 3}
@@ -1,8 +1,18 @@
+import io
 import pytest
 import logging
+import logging.handlers
 import os
 from unittest.mock import patch, Mock
-from etl_processing.services.logger import setup_logging
+from etl_processing.services.logger import setup_logging, stop_logging, _close_handlers, _listeners
+
+@pytest.fixture(autouse=True)
+def clean_logger():
+    yield
+    logger = logging.getLogger('accidents_etl')
+    stop_logging(logger)
+    _close_handlers(logger.handlers)
+    logger.handlers.clear()
 
 class TestLogger:
     def test_setup_logging_console(self):
@@ -14,8 +24,40 @@ class TestLogger:
     def test_setup_logging_file(self, tmp_path):
         log_file = tmp_path / "test.log"
         logger = setup_logging(log_file=str(log_file))
-        assert any(isinstance(h, logging.FileHandler) for h in logger.handlers)
-        assert os.path.exists(log_file)
+        buffered = [h for h in logger.handlers if isinstance(h, logging.handlers.MemoryHandler)]
+        assert len(buffered) == 1
+        assert buffered[0].capacity == 2048
+        assert buffered[0].flushLevel == logging.ERROR
+        
+        file_handler = buffered[0].target
+        assert isinstance(file_handler, logging.handlers.RotatingFileHandler)
+        assert file_handler.baseFilename == str(log_file)
+        assert file_handler.level == logging.INFO
+        assert file_handler.delay is True
+        assert file_handler.maxBytes == 64 * 1024 * 1024
+        assert file_handler.backupCount == 5
+        # Nothing is opened until the buffer flushes
+        assert file_handler.stream is None
+        assert not os.path.exists(log_file)
+
+    def test_setup_logging_file_flushes_on_error(self, tmp_path):
+        log_file = tmp_path / "test.log"
+        logger = setup_logging(log_file=str(log_file))
+        
+        logger.info("buffered message")
+        logger.error("error message")
+        assert "buffered message" in log_file.read_text()
+
+    def test_setup_logging_closes_previous_handlers(self, tmp_path):
+        logger = setup_logging(log_file=str(tmp_path / "first.log"))
+        buffered_handler = logger.handlers[1]
+        file_handler = buffered_handler.target
+        
+        with patch.object(buffered_handler, 'close') as buffered_close, \
+             patch.object(file_handler, 'close') as file_close:
+            setup_logging()
+        buffered_close.assert_called_once()
+        file_close.assert_called_once()
 
     def test_setup_logging_custom_level(self):
         logger = setup_logging(log_level='DEBUG')
@@ -29,4 +71,15 @@ class TestLogger:
 
     def test_setup_logging_invalid_level(self):
         with pytest.raises(AttributeError):
-            setup_logging(log_level='INVALID')
\ No newline at end of file
+            setup_logging(log_level='INVALID')
+
+    def test_setup_logging_queue(self):
+        logger = setup_logging(use_queue=True)
+        assert [type(h) for h in logger.handlers] == [logging.handlers.QueueHandler]
+        output = io.StringIO()
+        _listeners[logger.name].handlers[0].setStream(output)
+        
+        logger.info("queued message")
+        stop_logging(logger)
+        
+        assert "queued message" in output.getvalue()
@@ -1,8 +1,12 @@
 import pytest
-from unittest.mock import patch, Mock
+from unittest.mock import Mock
 import sys
+import etl_processing.main as main_module
 from etl_processing.main import main
 
+# monkeypatch swaps module attributes with a plain setattr and undoes it at
+# teardown, which is all these tests need from patch()
+
 @pytest.fixture
 def mock_config():
     return {
@@ -13,30 +17,40 @@ def mock_config():
         }
     }
 
-def test_main_no_args():
-    with patch('sys.argv', ['main.py']):
-        with patch('yaml.safe_load', return_value={'etl_types': {'test': {'description': 'Test'}}}):
-            main()
-
-def test_main_invalid_type():
-    with patch('sys.argv', ['main.py', 'invalid_type']):
-        with patch('yaml.safe_load', return_value={'etl_types': {'test': {'description': 'Test'}}}):
-            main()
-
-def test_main_valid_type(mock_config):
-    with patch('sys.argv', ['main.py', 'test_type']):
-        with patch('yaml.safe_load', return_value=mock_config):
-            with patch('etl_processing.main.GenericETL') as mock_etl:
-                main()
-                mock_etl.assert_called_once()
-
-def test_main_config_error():
-    with patch('sys.argv', ['main.py']):
-        with patch('yaml.safe_load', side_effect=Exception("Config error")):
-            main()
-
-def test_main_etl_error(mock_config):
-    with patch('sys.argv', ['main.py', 'test_type']):
-        with patch('yaml.safe_load', return_value=mock_config):
-            with patch('etl_processing.main.GenericETL', side_effect=Exception("ETL error")):
-                main()
\ No newline at end of file
+@pytest.fixture
+def default_config():
+    return {'etl_types': {'test': {'description': 'Test'}}}
+
+def _raise(error):
+    def fail(*args, **kwargs):
+        raise error
+    return fail
+
+def test_main_no_args(monkeypatch, default_config):
+    monkeypatch.setattr(sys, 'argv', ['main.py'])
+    monkeypatch.setattr(main_module, 'load_yaml_config', lambda path: default_config)
+    main()
+
+def test_main_invalid_type(monkeypatch, default_config):
+    monkeypatch.setattr(sys, 'argv', ['main.py', 'invalid_type'])
+    monkeypatch.setattr(main_module, 'load_yaml_config', lambda path: default_config)
+    main()
+
+def test_main_valid_type(monkeypatch, mock_config):
+    mock_etl = Mock()
+    monkeypatch.setattr(sys, 'argv', ['main.py', 'test_type'])
+    monkeypatch.setattr(main_module, 'load_yaml_config', lambda path: mock_config)
+    monkeypatch.setattr(main_module, 'GenericETL', mock_etl)
+    main()
+    mock_etl.assert_called_once()
+
+def test_main_config_error(monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['main.py'])
+    monkeypatch.setattr(main_module, 'load_yaml_config', _raise(Exception("Config error")))
+    main()
+
+def test_main_etl_error(monkeypatch, mock_config):
+    monkeypatch.setattr(sys, 'argv', ['main.py', 'test_type'])
+    monkeypatch.setattr(main_module, 'load_yaml_config', lambda path: mock_config)
+    monkeypatch.setattr(main_module, 'GenericETL', _raise(Exception("ETL error")))
+    main()
@@ -1,9 +1,13 @@
+import os
 import pytest
 import yaml
-from sqlalchemy import Column, Integer, String
-from sqlalchemy.orm import declarative_base
 from etl_processing.lib.model_factory import ModelFactory
 
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
 @pytest.fixture
 def sample_table_config():
     return {
@@ -21,13 +25,8 @@ def sample_table_config():
         }
     }
 
-@pytest.fixture
-def new_base():
-    return declarative_base()
-
 class TestModelFactory:
-    def test_create_model(self, sample_table_config, new_base):
-        ModelFactory.Base = new_base
+    def test_create_model(self, sample_table_config):
         model = ModelFactory.create_model('test', sample_table_config)
         assert model.__tablename__ == 'test_table'
         assert hasattr(model, 'id')
@@ -49,8 +48,60 @@ class TestModelFactory:
         
         config_file = tmp_path / "config.yml"
         with open(config_file, 'w') as f:
-            yaml.dump(config, f)
+            yaml.dump(config, f, Dumper=SafeDumper)
             
-        ModelFactory.Base = declarative_base()
         models = ModelFactory.load_models(str(config_file))
-        assert 'unique_table' in models
\ No newline at end of file
+        assert 'unique_table' in models
+    def test_create_model_with_indexes(self, sample_table_config):
+        sample_table_config['name'] = 'indexed_test_table'
+        sample_table_config['indexes'] = {
+            'uq_indexed_test_table_name': {'columns': ['name'], 'unique': True}
+        }
+        model = ModelFactory.create_model('indexed', sample_table_config)
+        ModelFactory.create_model('indexed', sample_table_config)
+        
+        indexes = model.__table__.indexes
+        assert len(indexes) == 1
+        index = next(iter(indexes))
+        assert index.unique
+        assert [column.name for column in index.columns] == ['name']
+
+    def test_load_models_cached(self, tmp_path):
+        config = {
+            'database': {
+                'tables': {
+                    'cached_table': {
+                        'name': 'cached_test_table',
+                        'columns': {
+                            'id': {'type': 'int unsigned', 'primary': True}
+                        }
+                    }
+                }
+            }
+        }
+        
+        config_file = tmp_path / "cached_config.yml"
+        with open(config_file, 'w') as f:
+            yaml.dump(config, f, Dumper=SafeDumper)
+            
+        first = ModelFactory.load_models(str(config_file))
+        second = ModelFactory.load_models(str(config_file))
+        assert first['cached_table'] is second['cached_table']
+        
+        # A modified file is loaded again
+        config['database']['tables']['cached_table']['columns']['label'] = {'type': 'varchar(50)'}
+        with open(config_file, 'w') as f:
+            yaml.dump(config, f, Dumper=SafeDumper)
+        os.utime(config_file, (0, 0))
+        third = ModelFactory.load_models(str(config_file))
+        assert third['cached_table'] is not first['cached_table']
+        assert hasattr(third['cached_table'], 'label')
+
+    def test_create_model_memoized(self, sample_table_config):
+        sample_table_config['name'] = 'memoized_test_table'
+        first = ModelFactory.create_model('memoized', sample_table_config)
+        
+        assert ModelFactory.create_model('memoized', dict(sample_table_config)) is first
+        
+        sample_table_config['columns']['label'] = {'type': 'varchar(50)'}
+        assert ModelFactory.create_model('memoized', sample_table_config) is not first
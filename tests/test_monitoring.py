@@ -3,9 +3,10 @@
 import pytest
 from unittest.mock import Mock, patch
 from datetime import datetime, timedelta
-from etl_processing.services.monitoring import MonitoringService, ETLMetrics
+from etl_processing.services.monitoring import MonitoringService, ETLMetrics, SampleBuffer, TimingStats
 from etl_processing.services.error_handler import ErrorHandler
 from etl_processing.services.batch_optimizer import BatchOptimizer
+from etl_processing.services.cli_reporting import CLIReporter
 
 @pytest.fixture
 def logger():
@@ -39,9 +40,74 @@ class TestMonitoring:
         assert metrics.records_processed == 2
         assert metrics.records_failed == 1
         assert 'validation' in metrics.error_counts
+        assert monitoring_service.error_history[0].record_id == '123'
+        assert monitoring_service.error_timestamp(monitoring_service.error_history[0]) <= datetime.now()
+        assert not hasattr(metrics, '__dict__')
         assert len(metrics.timings['processing']) == 2
         assert 0.5 < metrics.avg_processing_time < 0.7
 
+    def test_run_duration_and_success_rate(self):
+        start = datetime(2024, 1, 1, 10, 0)
+        metrics = ETLMetrics(start_time=start, end_time=start + timedelta(seconds=90),
+                             records_processed=3, records_failed=1)
+        
+        assert metrics.duration_seconds == 90.0
+        assert metrics.success_rate == 0.75
+        assert ETLMetrics(start_time=start).success_rate == 0
+
+    def test_sample_buffer_grows(self):
+        samples = SampleBuffer(capacity=2)
+        for value in (1.0, 2.0, 3.0, 6.0):
+            samples.append(value)
+        
+        assert len(samples) == 4
+        assert list(samples) == [1.0, 2.0, 3.0, 6.0]
+        assert samples.mean() == pytest.approx(3.0)
+        assert samples.total == pytest.approx(12.0)
+        assert SampleBuffer().mean() == 0
+
+    def test_sample_buffer_ring(self):
+        samples = SampleBuffer(capacity=2, max_size=3)
+        for value in (1.0, 2.0, 3.0, 4.0, 5.0):
+            samples.append(value)
+        
+        assert len(samples) == 3
+        assert samples.count == 5
+        assert list(samples) == [3.0, 4.0, 5.0]
+        assert samples.mean() == pytest.approx(3.0)
+
+    def test_timing_stats_online(self):
+        stats = TimingStats()
+        for value in (0.2, 0.4, 0.9):
+            stats.add(value)
+        
+        assert len(stats) == 3
+        assert stats.mean == pytest.approx(0.5)
+        assert (stats.min, stats.max) == (0.2, 0.9)
+        assert stats.percentiles(50) == pytest.approx(0.4)
+
+    def test_timing_stats_reservoir_bounded(self):
+        stats = TimingStats()
+        for value in range(5000):
+            stats.add(float(value))
+        
+        assert len(stats) == 5000
+        assert stats.mean == pytest.approx(2499.5)
+        assert len(stats._reservoir) == TimingStats.RESERVOIR_SIZE
+
+    def test_report_skipped_when_info_disabled(self):
+        logger = Mock()
+        logger.isEnabledFor.return_value = False
+        
+        CLIReporter(logger).report_metrics({})
+        
+        logger.info.assert_not_called()
+
+    def test_format_duration_over_a_day(self):
+        start = datetime(2024, 1, 1, 10, 0, 0)
+        
+        assert CLIReporter(Mock())._format_duration(start, start + timedelta(days=1, minutes=2, seconds=3)) == "24:02:03"
+
     def test_error_handling(self, error_handler):
         error = ValueError("Test error")
         context = {'record_id': '123'}
@@ -65,8 +131,71 @@ class TestMonitoring:
         
         stats = batch_optimizer.get_stats()
         assert stats['size_changes'] == 2
-        assert 'avg_success_rate' in stats
-        assert 'avg_processing_time' in stats
+        assert stats['avg_success_rate'] == pytest.approx(0.865)
+        assert stats['avg_processing_time'] == pytest.approx(45)
+
+    def test_batch_optimizer_aimd_settles(self):
+        optimizer = BatchOptimizer(initial_size=1000, step=100)
+        assert optimizer.adjust_size(success_rate=1.0, processing_time=10) == 1100
+        assert optimizer.adjust_size(success_rate=1.0, processing_time=90) == 990
+        
+        # Growth bisects towards the breached size, then holds below it
+        sizes = [optimizer.adjust_size(success_rate=1.0, processing_time=10) for _ in range(8)]
+        assert sizes[:2] == [1090, 1095]
+        assert all(size < 1100 for size in sizes)
+        assert sizes[-1] == sizes[-2]
+
+    def test_batch_optimizer_holds_on_noisy_times(self):
+        optimizer = BatchOptimizer(initial_size=1000, step=100)
+        for processing_time in (1, 29, 1, 29, 1):
+            optimizer.adjust_size(success_rate=1.0, processing_time=processing_time)
+        size = optimizer.current_size
+        
+        assert optimizer.adjust_size(success_rate=1.0, processing_time=29) == size
+
+    def test_batch_optimizer_regression_strategy(self):
+        optimizer = BatchOptimizer(initial_size=1000, step=100, strategy='regression')
+        sizes = []
+        for _ in range(BatchOptimizer.FIT_INTERVAL):
+            # Latency grows 10ms per record: the SLO of 30s fits 3000 records
+            processing_time = optimizer.current_size * 0.01
+            sizes.append(optimizer.adjust_size(success_rate=1.0, processing_time=processing_time))
+        
+        assert optimizer.fit_latency_model() == (pytest.approx(0.01), pytest.approx(0.0, abs=1e-9))
+        assert sizes[-1] == 3000
+        assert BatchOptimizer().fit_latency_model() is None
+        with pytest.raises(ValueError):
+            BatchOptimizer(strategy='unknown')
+
+    def test_batch_optimizer_regression_breach_on_fit_call(self):
+        optimizer = BatchOptimizer(initial_size=1000, step=100, strategy='regression')
+        for _ in range(BatchOptimizer.FIT_INTERVAL - 1):
+            optimizer.adjust_size(success_rate=1.0, processing_time=optimizer.current_size * 0.01)
+        assert optimizer.current_size == 1900
+        
+        # The fit is due, but a failing batch is still cut
+        assert optimizer.adjust_size(success_rate=0.5, processing_time=1.0) == 1710
+        assert optimizer._breach_size == 1900
+
+    def test_batch_optimizer_regression_window(self):
+        optimizer = BatchOptimizer(initial_size=1000, max_history=4)
+        for size, slope in [(1000, 0.05), (2000, 0.05), (1000, 0.01), (2000, 0.01),
+                            (3000, 0.01), (4000, 0.01)]:
+            optimizer.current_size = size
+            optimizer.adjust_size(success_rate=0.9, processing_time=size * slope)
+        
+        # Only the four most recent batches, all at 10ms per record, are fitted
+        assert optimizer.fit_latency_model() == (pytest.approx(0.01), pytest.approx(0.0, abs=1e-6))
+
+    def test_batch_optimizer_bounded_history(self):
+        optimizer = BatchOptimizer(max_history=2)
+        for success_rate in (0.5, 0.9, 1.0):
+            optimizer.adjust_size(success_rate=success_rate, processing_time=10)
+        
+        stats = optimizer.get_stats()
+        assert len(optimizer.history) == 2
+        assert stats['size_changes'] == 3
+        assert stats['avg_success_rate'] == pytest.approx(0.95)
 
 @pytest.mark.integration
 class TestIntegrationMonitoring:
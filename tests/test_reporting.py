@@ -1,7 +1,9 @@
+import json
 import pytest
 from unittest.mock import Mock, patch
 from datetime import datetime
 from etl_processing.services.reporting import ETLReport
+from etl_processing.services.monitoring import TimingStats
 
 @pytest.fixture
 def mock_logger():
@@ -21,6 +23,8 @@ def mock_metrics():
     metrics.timings = {'op': [1.0, 2.0]}
     metrics.error_counts = {'error': 5}
     metrics.avg_processing_time = 1.5
+    metrics.duration_seconds = 60.0
+    metrics.success_rate = 100 / 110
     return metrics
 
 def test_format_timings(report):
@@ -31,12 +35,34 @@ def test_format_timings(report):
     result = report._format_timings(timings)
     assert 'operation1' in result
     assert 'operation2' in result
+    assert 'p99=2.980s' in result
+
+def test_timing_stats(report):
+    stats = report._timing_stats([float(i) for i in range(1, 101)])
+    assert stats['avg'] == pytest.approx(50.5)
+    assert stats['min'] == 1.0
+    assert stats['max'] == 100.0
+    assert stats['p50'] == pytest.approx(50.5)
+    assert stats['p95'] == pytest.approx(95.05)
+    assert stats['p99'] == pytest.approx(99.01)
+    assert stats['count'] == 100
+    assert report._timing_stats([])['count'] == 0
+
+def test_timing_stats_from_accumulator(report):
+    stats = TimingStats()
+    for value in (1.0, 2.0, 3.0):
+        stats.add(value)
+    result = report._timing_stats(stats)
+    assert result['avg'] == pytest.approx(2.0)
+    assert (result['min'], result['max'], result['count']) == (1.0, 3.0, 3)
+    assert result['p50'] == pytest.approx(2.0)
 
 def test_format_errors(report):
     errors = {'validation': 5, 'mapping': 3}
     result = report._format_errors(errors)
     assert 'validation: 5' in result
     assert 'mapping: 3' in result
+    assert report._format_errors({'rare': 1, 'common': 9}) == "common: 9\nrare: 1"
 
 def test_generate_summary(report, mock_metrics):
     result = report.generate_summary(mock_metrics)
@@ -50,6 +76,29 @@ def test_save_metrics(report, mock_metrics, tmp_path):
         report.save_metrics(mock_metrics)
         mock_open.assert_called_once()
 
+def test_file_timestamp(report):
+    now = datetime(2024, 1, 2, 3, 4, 5)
+    assert report.file_timestamp(now) == now.strftime('%Y%m%d_%H%M%S')
+
+def test_save_reports_share_timestamp(report, mock_metrics):
+    with patch('builtins.open', create=True) as mock_open:
+        report.save_metrics(mock_metrics, timestamp='20240101_100000')
+        report.save_summary(mock_metrics, timestamp='20240101_100000')
+    paths = [call.args[0] for call in mock_open.call_args_list]
+    assert paths == ['reports/metrics/metrics_20240101_100000.json',
+                     'reports/summaries/summary_20240101_100000.json']
+
+def test_save_metrics_stream(mock_logger, mock_metrics, tmp_path):
+    stream_path = tmp_path / "metrics.jsonl"
+    report = ETLReport(mock_logger, metrics_stream_path=str(stream_path))
+    report.save_metrics(mock_metrics)
+    report.save_metrics(mock_metrics)
+    report.close()
+
+    lines = stream_path.read_text().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0])['batch_metrics']['records_processed'] == 100
+
 def test_get_metrics_summary(report, mock_metrics):
     summary = report.get_metrics_summary(mock_metrics)
     assert summary['total_processed'] == 100
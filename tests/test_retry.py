@@ -3,6 +3,7 @@
 import pytest
 import logging
 from unittest.mock import Mock, patch
+import threading
 import time
 from etl_processing.services.retry import with_retry, RetryTracker, RetryableError
 
@@ -61,6 +62,29 @@ class TestRetry:
         delays = [attempts[i+1] - attempts[i] for i in range(len(attempts)-1)]
         assert all(d <= 2.1 for d in delays)  # Allow small timing variance
 
+    def test_backoff_table(self):
+        @with_retry(max_attempts=5, delay=1.0, backoff_factor=3, max_delay=5.0)
+        def operation():
+            pass
+        
+        assert operation.retry_delays == (1.0, 3.0, 5.0, 5.0)
+
+    def test_cancel_event_stops_retrying(self, logger):
+        cancel = threading.Event()
+        attempts = []
+        
+        @with_retry(max_attempts=3, delay=10.0, logger=logger, cancel_event=cancel)
+        def operation():
+            attempts.append(1)
+            cancel.set()
+            raise ValueError("Always fails")
+        
+        start = time.monotonic()
+        with pytest.raises(ValueError):
+            operation()
+        assert time.monotonic() - start < 1.0
+        assert len(attempts) == 1
+
     def test_retry_tracker(self, retry_tracker):
         @with_retry(max_attempts=2, delay=0.1)
         def successful_operation():
@@ -81,6 +105,16 @@ class TestRetry:
         assert stats["successful_operation"]["success_rate"] == 1.0
         assert stats["failing_operation"]["success_rate"] == 0.0
 
+    def test_retry_tracker_counts(self, retry_tracker):
+        for success in (True, False, True, True):
+            retry_tracker.record_attempt("load", success)
+        retry_tracker.record_attempt("save", True)
+        
+        stats = retry_tracker.get_stats()
+        assert stats["load"] == {"success_rate": 0.75, "total_attempts": 4, "total_failures": 1}
+        assert stats["save"]["total_attempts"] == 1
+        assert RetryTracker().get_stats() == {}
+
     def test_custom_exceptions(self, logger):
         @with_retry(max_attempts=2, delay=0.1, exceptions=(ValueError,), logger=logger)
         def operation():
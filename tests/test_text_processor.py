@@ -16,6 +16,18 @@ def test_calculate_text_similarity():
     assert TextProcessor.calculate_text_similarity("test", "test") == 1.0
     assert TextProcessor.calculate_text_similarity("test", "completely different") == 0.0
     assert TextProcessor.calculate_text_similarity("", "") == 0.0
+    assert TextProcessor.calculate_text_similarity(" Neige Dure", "neige dure ") == 1.0
+    assert TextProcessor.calculate_text_similarity("a b c", "B c D") == pytest.approx(0.5)
 
     with pytest.raises(ValueError):
-        TextProcessor.calculate_text_similarity("test", "test", method="invalid")
\ No newline at end of file
+        TextProcessor.calculate_text_similarity("test", "test", method="invalid")
+
+def test_batch_similarity():
+    candidates = ["Neige dure", "neige molle", "autre"]
+    scores = TextProcessor.batch_similarity("neige DURE", candidates)
+    assert scores == [TextProcessor.calculate_text_similarity("neige DURE", c) for c in candidates]
+    assert scores[0] == 1.0
+    assert TextProcessor.batch_similarity("x", []) == []
+
+    with pytest.raises(ValueError):
+        TextProcessor.batch_similarity("x", ["y"], method="invalid")
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 from etl_processing.services.timing import timing_metric
 
 def test_timing_decorator():
@@ -19,4 +19,11 @@ def test_timing_decorator():
     monitoring.record_timing.assert_called_once()
     metric_name, duration = monitoring.record_timing.call_args[0]
     assert metric_name == "test_metric"
-    assert isinstance(duration, float)
\ No newline at end of file
+    assert isinstance(duration, float)
+
+def test_timing_disabled_returns_function():
+    def method(self):
+        return "result"
+
+    with patch('etl_processing.services.timing.TIMING_DISABLED', True):
+        assert timing_metric("test_metric")(method) is method